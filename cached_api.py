@@ -0,0 +1,45 @@
+"""
+Cached API Module
+Streamlit-cached wrappers around the Space-Track fetches and TLE parsing
+"""
+
+import hashlib
+import streamlit as st
+from spacetrack_api import fetch_gp_histories_batched, fetch_multiple_tles
+from dop_calculations import parse_tle_data
+
+
+def _credential_digest(username: str, password: str):
+    """Digest of the credentials, so cache keys depend on them without holding the password."""
+    return hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_gp_histories_cached(norad_ids, start_date: str, end_date: str, credentials: str,
+                               _username: str, _password: str):
+    """Cached GP history records per NORAD ID; underscored arguments are not hashed."""
+    return fetch_gp_histories_batched(norad_ids, start_date, end_date, _username, _password)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_multiple_tles_cached(norad_ids, credentials: str, _username: str, _password: str):
+    """Cached latest TLE text; underscored arguments are not hashed."""
+    return fetch_multiple_tles(norad_ids, _username, _password)
+
+
+def cached_fetch_gp_histories(norad_ids, start_date: str, end_date: str, username: str, password: str):
+    """fetch_gp_histories_batched, cached on the NORAD IDs, date range and credentials."""
+    return _fetch_gp_histories_cached(tuple(int(n) for n in norad_ids), start_date, end_date,
+                                      _credential_digest(username, password), username, password)
+
+
+def cached_fetch_multiple_tles(norad_ids, username: str, password: str):
+    """fetch_multiple_tles, cached on the NORAD IDs and credentials."""
+    return _fetch_multiple_tles_cached(tuple(norad_ids), _credential_digest(username, password),
+                                       username, password)
+
+
+@st.cache_resource(show_spinner=False)
+def cached_parse_tle_data(tle_text, sat_dict):
+    """parse_tle_data, cached on the TLE text (the result is shared, do not mutate it)."""
+    return parse_tle_data(tle_text, sat_dict)
@@ -3,10 +3,15 @@ Configuration file for NavIC Comprehensive Monitoring System
 Contains all constants, satellite data, and configuration parameters
 """
 
+from dataclasses import dataclass
+
 # Constants
 MU = 398600.4418  # km^3/s^2
 R_EARTH = 6371.0  # km
 GEOSYNC_MEAN_MOTION = 1.002737909  # revolutions/day for perfect geostationary orbit
+WGS84_A_KM = 6378.137  # km, WGS84 equatorial radius
+WGS84_F = 1 / 298.257223563  # WGS84 flattening
+WGS84_E2 = WGS84_F * (2 - WGS84_F)  # WGS84 first eccentricity squared
 
 # NavIC Satellite NORAD IDs
 NAVIK_SATS = {
@@ -61,6 +66,23 @@ DEFAULT_PARAMS = {
     "prop_duration_days": 1.5
 }
 
+
+@dataclass(frozen=True, slots=True)
+class AnalysisConfig:
+    """Analysis parameters for one run, defaulting to DEFAULT_PARAMS."""
+    z_threshold: float = DEFAULT_PARAMS["z_threshold"]
+    sma_threshold: float = DEFAULT_PARAMS["sma_threshold"]
+    inc_threshold: float = DEFAULT_PARAMS["inc_threshold"]
+    persist_window: int = DEFAULT_PARAMS["persist_window"]
+    inclination_tolerance: float = DEFAULT_PARAMS["inclination_tolerance"]
+    drift_tolerance_gso: float = DEFAULT_PARAMS["drift_tolerance_gso"]
+    min_maneuvers_per_month: int = DEFAULT_PARAMS["min_maneuvers_per_month"]
+    max_maneuvers_per_month: int = DEFAULT_PARAMS["max_maneuvers_per_month"]
+    maneuver_uniformity_threshold: float = DEFAULT_PARAMS["maneuver_uniformity_threshold"]
+    elevation_mask_deg: int = DEFAULT_PARAMS["elevation_mask_deg"]
+    timestep_minutes: int = DEFAULT_PARAMS["timestep_minutes"]
+    prop_duration_days: float = DEFAULT_PARAMS["prop_duration_days"]
+
 # DOP quality thresholds
 DOP_QUALITY_THRESHOLDS = {
     "Excellent": 2,
@@ -3,20 +3,44 @@ DOP (Dilution of Precision) Calculation Module
 Handles DOP calculations and satellite position computations
 """
 
+import math
 import numpy as np
-import statistics
+from functools import lru_cache
 from datetime import datetime, timedelta
 from datetime import timezone
-from skyfield.api import load, EarthSatellite, wgs84
-from config import NAVIK_SATS
+from sgp4.api import Satrec, SatrecArray, SGP4_ERRORS, jday
+from skyfield.api import load, wgs84
+from skyfield.sgp4lib import theta_GMST1982
+from skyfield.timelib import Time
+from config import NAVIK_SATS, WGS84_A_KM, WGS84_E2, DOP_QUALITY_THRESHOLDS
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba is optional; kernels then run as plain Python
+    HAS_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Shared timescale, built once at import instead of on every call
+_TS = load.timescale(builtin=True)
+
+# GDOP quality bins: a value below bin i (and at or above bin i-1) gets label i;
+# anything at or above the last finite threshold (or NaN) is the last label
+_DOP_QUALITY_LABELS = np.array(list(DOP_QUALITY_THRESHOLDS))
+_DOP_QUALITY_BINS = np.array(list(DOP_QUALITY_THRESHOLDS.values())[:-1], dtype=float)
 
 
 def parse_tle_data(tle_text, sat_dict):
-    """Parse TLE text and create satellite objects"""
-    ts = load.timescale()
+    """Parse TLE text and create SGP4 satellite records"""
     satellites = {}
     
     lines = tle_text.strip().split('\n')
+    id_to_name = {s_id: s_name for s_name, s_id in sat_dict.items()}
     
     for i in range(0, len(lines), 3):
         if i + 2 >= len(lines):
@@ -26,17 +50,14 @@ def parse_tle_data(tle_text, sat_dict):
         line1 = lines[i + 1].strip()
         line2 = lines[i + 2].strip()
         
+        if not line1.startswith('1 '):
+            continue
+        
         try:
-            norad_id = int(line1[2:7])
-            sat_name = None
-            for s_name, s_id in sat_dict.items():
-                if s_id == norad_id:
-                    sat_name = s_name
-                    break
+            sat_name = id_to_name.get(int(line1[2:7]))
             
             if sat_name:
-                satellite = EarthSatellite(line1, line2, sat_name, ts)
-                satellites[sat_name] = satellite
+                satellites[sat_name] = Satrec.twoline2rv(line1, line2)
         except (ValueError, IndexError):
             continue
     
@@ -46,39 +67,154 @@ def parse_tle_data(tle_text, sat_dict):
 def calculate_satellite_position(satellite, time, observer_location):
     """Calculate satellite position relative to observer"""
     try:
-        difference = satellite - observer_location
-        topocentric = difference.at(time)
-        alt, az, distance = topocentric.altaz()
+        # Plain geometry: rotate the ITRF line of sight into the observer's
+        # East/North/Up frame rather than building a Skyfield altaz chain
+        r_itrf, errors = _propagate_itrf([satellite], time)
+        if errors.any():
+            return None
+        
+        line_of_sight = r_itrf[0] - observer_location.itrs_xyz.km
+        rotation = _enu_rotation(observer_location.latitude.degrees,
+                                 observer_location.longitude.degrees)
+        east, north, up = np.dot(rotation, line_of_sight.T)
+        
+        distance = np.sqrt(east**2 + north**2 + up**2)
+        elevation = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        azimuth = np.degrees(np.arctan2(east, north)) % 360.0
+        
+        if not time.shape:
+            distance, elevation, azimuth = float(distance[0]), float(elevation[0]), float(azimuth[0])
         
         return {
-            'altitude': alt.degrees,
-            'azimuth': az.degrees,
-            'distance': distance.km,
-            'elevation': alt.degrees
+            'altitude': elevation,
+            'azimuth': azimuth,
+            'distance': distance,
+            'elevation': elevation
         }
     except Exception:
         return None
 
 
+@njit(cache=True, fastmath=True)
+def _design_matrix_kernel(az_deg, el_deg, elevation_mask_deg):
+    """Design matrix rows for the satellites above the elevation mask."""
+    n_visible = 0
+    for i in range(len(el_deg)):
+        if el_deg[i] > elevation_mask_deg:
+            n_visible += 1
+    
+    H = np.empty((n_visible, 4))
+    k = 0
+    for i in range(len(el_deg)):
+        if el_deg[i] > elevation_mask_deg:
+            az_rad = math.radians(az_deg[i])
+            el_rad = math.radians(el_deg[i])
+            cos_el = math.cos(el_rad)
+            H[k, 0] = cos_el * math.sin(az_rad)
+            H[k, 1] = cos_el * math.cos(az_rad)
+            H[k, 2] = math.sin(el_rad)
+            H[k, 3] = 1.0
+            k += 1
+    
+    return H
+
+
 def calculate_design_matrix(satellite_positions, observer_lat, observer_lon, elevation_mask_deg=5):
     """Calculate the geometry matrix (design matrix) for DOP calculation"""
-    H = []
+    positions = [pos for pos in satellite_positions if pos is not None]
+    az_deg = np.empty(len(positions))
+    el_deg = np.empty(len(positions))
+    for i, pos in enumerate(positions):
+        az_deg[i] = pos['azimuth']
+        el_deg[i] = pos['elevation']
     
-    for pos in satellite_positions:
-        if pos is None:
+    return _design_matrix_kernel(az_deg, el_deg, float(elevation_mask_deg))
+
+
+def _schur_cofactors(a, b, c, d, e, f, s0, s1, s2):
+    """
+    Closed-form pieces of (HᵀH)⁻¹ for design matrices whose last column is ones.
+    
+    HᵀH then has the block form [[A, s], [sᵀ, n]] and is inverted through
+    its Schur complement M = A - s sᵀ / n = [[a, b, c], [b, d, e], [c, e, f]].
+    Returns the diagonal cofactors of M, sᵀ adj(M) s and det(M), so that
+    diag((HᵀH)⁻¹) = (c00/det, c11/det, c22/det, 1/n + sᵀ adj(M) s / (n² det)).
+    Accepts floats or arrays.
+    """
+    c00 = d * f - e * e
+    c01 = c * e - b * f
+    c02 = b * e - c * d
+    c11 = a * f - c * c
+    c12 = b * c - a * e
+    c22 = a * d - b * b
+    det = a * c00 + b * c01 + c * c02
+    
+    s_adj_s = (c00 * s0 * s0 + c11 * s1 * s1 + c22 * s2 * s2
+               + 2 * (c01 * s0 * s1 + c02 * s0 * s2 + c12 * s1 * s2))
+    
+    return c00, c11, c22, s_adj_s, det
+
+
+_schur_cofactors_jit = njit(cache=True)(_schur_cofactors)
+
+
+@njit(cache=True, parallel=True)
+def _dop_kernel(az_deg, el_deg, elevation_mask_deg):
+    """
+    GDOP, PDOP, HDOP, VDOP and TDOP for each row of (n_cases, n_sats) az/el arrays.
+    
+    Fuses the design matrix, HᵀH and its closed-form inverse into one pass
+    per case, with the cases spread over threads. Satellites with NaN
+    elevation are skipped; rows where DOP is undefined are NaN.
+    """
+    n_cases, n_sats = el_deg.shape
+    out = np.empty((n_cases, 5))
+    
+    for i in prange(n_cases):
+        n = 0
+        s0 = s1 = s2 = 0.0
+        a00 = a01 = a02 = a11 = a12 = a22 = 0.0
+        for j in range(n_sats):
+            if el_deg[i, j] > elevation_mask_deg:
+                az_rad = math.radians(az_deg[i, j])
+                el_rad = math.radians(el_deg[i, j])
+                cos_el = math.cos(el_rad)
+                dx = cos_el * math.sin(az_rad)
+                dy = cos_el * math.cos(az_rad)
+                dz = math.sin(el_rad)
+                n += 1
+                s0 += dx
+                s1 += dy
+                s2 += dz
+                a00 += dx * dx
+                a01 += dx * dy
+                a02 += dx * dz
+                a11 += dy * dy
+                a12 += dy * dz
+                a22 += dz * dz
+        
+        if n < 4:
+            out[i, :] = np.nan
             continue
-            
-        if pos['elevation'] > elevation_mask_deg:
-            az_rad = np.radians(pos['azimuth'])
-            el_rad = np.radians(pos['elevation'])
-            
-            dx = np.cos(el_rad) * np.sin(az_rad)
-            dy = np.cos(el_rad) * np.cos(az_rad)
-            dz = np.sin(el_rad)
-            
-            H.append([dx, dy, dz, 1])
+        
+        c00, c11, c22, s_adj_s, det = _schur_cofactors_jit(
+            a00 - s0 * s0 / n, a01 - s0 * s1 / n, a02 - s0 * s2 / n,
+            a11 - s1 * s1 / n, a12 - s1 * s2 / n, a22 - s2 * s2 / n,
+            s0, s1, s2
+        )
+        if not det > 0:
+            out[i, :] = np.nan
+            continue
+        
+        q_x, q_y, q_z = c00 / det, c11 / det, c22 / det
+        q_t = 1 / n + s_adj_s / (n * n * det)
+        out[i, 0] = math.sqrt(q_x + q_y + q_z + q_t)
+        out[i, 1] = math.sqrt(q_x + q_y + q_z)
+        out[i, 2] = math.sqrt(q_x + q_y)
+        out[i, 3] = math.sqrt(q_z)
+        out[i, 4] = math.sqrt(q_t)
     
-    return np.array(H) if H else np.array([]).reshape(0, 4)
+    return out
 
 
 def calculate_dop_values(H):
@@ -86,108 +222,389 @@ def calculate_dop_values(H):
     if len(H) < 4:
         return None
     
-    try:
-        HTH = np.dot(H.T, H)
-        
-        if np.linalg.det(HTH) == 0:
-            return None
-            
-        Q = np.linalg.inv(HTH)
-        
-        dop = {
-            'GDOP': float(np.sqrt(np.trace(Q))),
-            'PDOP': float(np.sqrt(Q[0,0] + Q[1,1] + Q[2,2])),
-            'HDOP': float(np.sqrt(Q[0,0] + Q[1,1])),
-            'VDOP': float(np.sqrt(Q[2,2])),
-            'TDOP': float(np.sqrt(Q[3,3])),
-        }
-        
-        return dop
-    except np.linalg.LinAlgError:
+    # Closed-form inverse of the 4x4 normal matrix, no LAPACK call
+    U = H[:, :3]
+    n = len(H)
+    s = U.sum(axis=0)
+    (a, b, c), (_, d, e), (_, _, f) = (np.dot(U.T, U) - np.outer(s, s) / n).tolist()
+    c00, c11, c22, s_adj_s, det = _schur_cofactors(a, b, c, d, e, f, *s.tolist())
+    
+    if not det > 0:
         return None
+    
+    q_x, q_y, q_z = c00 / det, c11 / det, c22 / det
+    q_t = 1 / n + s_adj_s / (n * n * det)
+    
+    dop = {
+        'GDOP': float(np.sqrt(q_x + q_y + q_z + q_t)),
+        'PDOP': float(np.sqrt(q_x + q_y + q_z)),
+        'HDOP': float(np.sqrt(q_x + q_y)),
+        'VDOP': float(np.sqrt(q_z)),
+        'TDOP': float(np.sqrt(q_t)),
+    }
+    
+    return dop
 
 
-def calculate_dop_for_location(satellites_dict, lat, lon, time, elevation_mask_deg=5):
-    """Calculate DOP for a specific location and time"""
-    ts = load.timescale()
-    t = ts.utc(time.year, time.month, time.day, time.hour, time.minute, time.second)
+def calculate_dop_values_batch(H):
+    """
+    Calculate DOP values for a stack of design matrices in one pass.
+    
+    Parameters:
+    -----------
+    H : array-like or list of arrays
+        Design matrices of shape (..., k, 4) whose last column is ones for
+        every visible satellite. Rows of zeros stand for satellites that are
+        not visible and do not contribute. A list of (k_i, 4) matrices is
+        zero-padded to a common k.
+    
+    Returns:
+    --------
+    dict : 'GDOP', 'PDOP', 'HDOP', 'VDOP', 'TDOP' arrays of shape (...),
+           NaN where fewer than 4 satellites are visible or the geometry
+           is singular (same criterion as calculate_dop_values)
+    """
+    if isinstance(H, (list, tuple)):
+        k_max = max((len(h) for h in H), default=0)
+        padded = np.zeros((len(H), k_max, 4))
+        for i, h in enumerate(H):
+            padded[i, :len(h)] = h
+        H = padded
+    
+    H = np.asarray(H, dtype=float)
+    batch_shape = H.shape[:-2]
+    H = H.reshape(-1, H.shape[-2], 4)
+    
+    n_visible = np.count_nonzero(np.any(H != 0, axis=2), axis=1)
+    n = np.maximum(n_visible, 1).astype(float)
+    
+    # Closed-form inverse of every normal matrix at once, no LAPACK call
+    U = H[:, :, :3]
+    s = U.sum(axis=1)
+    M = np.einsum('nki,nkj->nij', U, U) - s[:, :, None] * s[:, None, :] / n[:, None, None]
+    c00, c11, c22, s_adj_s, det = _schur_cofactors(
+        M[:, 0, 0], M[:, 0, 1], M[:, 0, 2], M[:, 1, 1], M[:, 1, 2], M[:, 2, 2],
+        s[:, 0], s[:, 1], s[:, 2]
+    )
+    
+    valid = (n_visible >= 4) & (det > 0)
+    det = np.where(valid, det, 1.0)
+    q_x, q_y, q_z = c00 / det, c11 / det, c22 / det
+    q_t = 1 / n + s_adj_s / (n * n * det)
+    
+    with np.errstate(invalid='ignore'):
+        dop = {
+            'GDOP': np.sqrt(q_x + q_y + q_z + q_t),
+            'PDOP': np.sqrt(q_x + q_y + q_z),
+            'HDOP': np.sqrt(q_x + q_y),
+            'VDOP': np.sqrt(q_z),
+            'TDOP': np.sqrt(q_t),
+        }
+    
+    for key in dop:
+        dop[key][~valid] = np.nan
+        dop[key] = dop[key].reshape(batch_shape)
     
+    return dop
+
+
+@lru_cache(maxsize=64)
+def _observer_for(lat, lon):
+    """Cached WGS84 observer at (lat, lon) and its read-only ITRF position in km."""
     observer = wgs84.latlon(lat, lon)
+    itrs_km = observer.itrs_xyz.km
+    itrs_km.flags.writeable = False
+    return observer, itrs_km
+
+
+def calculate_dop_for_location(satellites_dict, lat, lon, time, elevation_mask_deg=5, ts=None,
+                               positions=None):
+    """
+    Calculate DOP for a specific location and time (datetime or scalar skyfield Time).
+    
+    positions may hold propagate_all(satellites_dict, time) to reuse an
+    ephemeris that was already computed for this time.
+    """
+    if isinstance(time, Time):
+        t = time
+    else:
+        ts = ts or _TS
+        t = ts.utc(time.year, time.month, time.day, time.hour, time.minute, time.second)
+    
+    if not satellites_dict:
+        return None, [], []
+    
+    _, observer_itrf = _observer_for(float(lat), float(lon))
+    sat_names = list(satellites_dict)
     
-    satellite_positions = []
-    visible_sats = []
+    # All satellites in one SGP4 call; TEME -> ITRF by the GMST rotation
+    # only, since DOP geometry is insensitive to precession-nutation
+    r_itrf, errors = positions if positions is not None else _propagate_itrf(satellites_dict.values(), t)
+    line_of_sight = r_itrf[:, 0, :] - observer_itrf
+    east, north, up = _enu_rotation(lat, lon) @ line_of_sight.T
     
-    for sat_name, sat_obj in satellites_dict.items():
-        pos = calculate_satellite_position(sat_obj, t, observer)
-        if pos:
-            satellite_positions.append(pos)
-            if pos['elevation'] > elevation_mask_deg:
-                visible_sats.append(sat_name)
+    distance = np.sqrt(east**2 + north**2 + up**2)
+    el_deg = np.degrees(np.arctan2(up, np.hypot(east, north)))
+    az_deg = np.degrees(np.arctan2(east, north)) % 360.0
     
-    H = calculate_design_matrix(satellite_positions, lat, lon, elevation_mask_deg)
+    # One entry per satellite, in satellites_dict order (None where SGP4
+    # failed), so callers can pair positions with names by index
+    ok = errors[:, 0] == 0
+    satellite_positions = [
+        {'altitude': el, 'azimuth': az, 'distance': d, 'elevation': el} if valid else None
+        for el, az, d, valid in zip(el_deg.tolist(), az_deg.tolist(), distance.tolist(), ok.tolist())
+    ]
+    visible_sats = [name for name, el, valid in zip(sat_names, el_deg, ok)
+                    if valid and el > elevation_mask_deg]
+    
+    H = _design_matrix_kernel(az_deg[ok], el_deg[ok], float(elevation_mask_deg))
     dop = calculate_dop_values(H)
     
     return dop, visible_sats, satellite_positions
 
 
-def get_geo_box_vectorized(satellite, epoch, timestep_minutes, prop_duration_days):
-    """Calculate geographic bounding box for satellite propagation."""
+def _to_time(times, ts):
+    """Convert a datetime, sequence of datetimes (naive = UTC) or datetime64 array to a Skyfield Time."""
+    if isinstance(times, Time):
+        return times
+    if isinstance(times, np.ndarray) and np.issubdtype(times.dtype, np.datetime64):
+        # Whole UTC days since 1970 plus seconds of day, so leap seconds are
+        # looked up for each date; converted in one vectorized call
+        days = times.astype('datetime64[D]')
+        seconds = (times - days) / np.timedelta64(1, 's')
+        return ts.utc(1970, 1, 1 + (days - np.datetime64('1970-01-01', 'D')).astype(np.int64), 0, 0, seconds)
+    if isinstance(times, datetime):
+        times = [times]
+    return ts.from_datetimes([
+        dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc) for dt in times
+    ])
+
+
+def _enu_rotation(lat_deg, lon_deg):
+    """Stacked ITRF -> local East/North/Up rotation matrices, shape (..., 3, 3)."""
+    lat = np.radians(lat_deg)
+    lon = np.radians(lon_deg)
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    sin_lon, cos_lon = np.sin(lon), np.cos(lon)
+    zero = np.zeros_like(lat)
+    
+    return np.stack([
+        np.stack([-sin_lon, cos_lon, zero], axis=-1),
+        np.stack([-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat], axis=-1),
+        np.stack([cos_lat * cos_lon, cos_lat * sin_lon, sin_lat], axis=-1),
+    ], axis=-2)
+
+
+def calculate_dop_batch(satellites_dict, lats, lons, times, elevation_mask_deg=5, ts=None,
+                        positions=None):
+    """
+    Calculate DOP for many locations and times at once.
+    
+    Satellites are propagated once for all times, and the topocentric
+    geometry for every location is obtained by rotating the line-of-sight
+    vectors into each local East/North/Up frame with NumPy.
+    
+    Parameters:
+    -----------
+    satellites_dict : dict
+        Satellite name -> sgp4 Satrec (or Skyfield EarthSatellite)
+    lats, lons : array-like
+        Observer latitudes and longitudes in degrees, length L
+    times : datetime, sequence of datetimes, datetime64 array or skyfield Time
+        Calculation times, length T (naive datetimes are taken as UTC)
+    elevation_mask_deg : float
+        Minimum elevation for a satellite to be used
+    ts : skyfield Timescale, optional
+        Timescale to use instead of the shared module timescale
+    positions : tuple, optional
+        propagate_all(satellites_dict, times) result to reuse
+    
+    Returns:
+    --------
+    dict : 'GDOP', 'PDOP', 'HDOP', 'VDOP', 'TDOP' arrays of shape (L, T),
+           NaN where DOP is undefined; 'visible' counts of shape (L, T);
+           'elevation' and 'azimuth' in degrees of shape (L, n_sats, T)
+    """
+    t = _to_time(times, ts or _TS)
+    
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    
+    r_itrf, errors = positions if positions is not None else _propagate_itrf(satellites_dict.values(), t)
+    observer_itrf = wgs84.latlon(lats, lons).itrs_xyz.km.T
+    
+    # Line of sight (L, S, T, 3) rotated into each observer's ENU frame
+    line_of_sight = r_itrf[np.newaxis] - observer_itrf[:, np.newaxis, np.newaxis, :]
+    enu = np.einsum('lij,lstj->lsti', _enu_rotation(lats, lons), line_of_sight)
+    unit = enu / np.linalg.norm(enu, axis=-1, keepdims=True)
+    unit[:, errors != 0] = np.nan
+    
+    elevation = np.degrees(np.arcsin(unit[..., 2]))
+    azimuth = np.degrees(np.arctan2(unit[..., 0], unit[..., 1])) % 360.0
+    visible = elevation > elevation_mask_deg
+    
+    if HAS_NUMBA:
+        # Compiled fused kernel over every (location, time) case
+        n_sats = elevation.shape[1]
+        dop = _dop_kernel(
+            np.ascontiguousarray(azimuth.transpose(0, 2, 1)).reshape(-1, n_sats),
+            np.ascontiguousarray(elevation.transpose(0, 2, 1)).reshape(-1, n_sats),
+            float(elevation_mask_deg)
+        ).reshape(len(lats), -1, 5)
+        result = {key: dop[..., k] for k, key in enumerate(('GDOP', 'PDOP', 'HDOP', 'VDOP', 'TDOP'))}
+    else:
+        # The design matrix rows are the ENU unit vectors of the visible
+        # satellites; hidden satellites become zero rows, shape (L, T, S, 4)
+        H = np.concatenate([unit, np.ones(unit.shape[:-1] + (1,))], axis=-1)
+        H[~visible] = 0.0
+        result = calculate_dop_values_batch(H.transpose(0, 2, 1, 3))
+    
+    result['visible'] = visible.sum(axis=1)
+    result['elevation'] = elevation
+    result['azimuth'] = azimuth
+    
+    return result
+
+
+@lru_cache(maxsize=32)
+def _offsets_days(timestep_minutes, prop_duration_days):
+    """Read-only step offsets in days after the epoch, excluding both end points."""
+    duration = timedelta(days=prop_duration_days)
+    delta_t = duration.seconds + 24*3600*duration.days
+    n_steps = int(delta_t / (timestep_minutes * 60)) + 1
+    
+    offsets = np.arange(1, n_steps-1) * (timestep_minutes / 1440.0)
+    offsets.flags.writeable = False
+    return offsets
+
+
+def _propagation_times(epoch, timestep_minutes, prop_duration_days, ts):
+    """Build the Time array of propagation steps following epoch."""
     if epoch.tzinfo is None:
         epoch = epoch.replace(tzinfo=timezone.utc)
     
-    t1 = epoch
-    t2 = t1 + timedelta(days=prop_duration_days)
-    delta_t = (t2 - t1).seconds + 24*3600*(t2 - t1).days
-    n_steps = int(delta_t / (timestep_minutes * 60)) + 1
+    offsets_days = _offsets_days(timestep_minutes, prop_duration_days)
+    
+    # One Time array for every step, so SGP4 and the Earth-orientation
+    # terms are evaluated in a single vectorized pass
+    base = ts.from_datetime(epoch.astimezone(timezone.utc))
+    return ts.tt_jd(base.whole, base.tt_fraction + offsets_days)
+
+
+def _satrec(satellite):
+    """The sgp4 Satrec behind a Satrec or a Skyfield EarthSatellite."""
+    return getattr(satellite, 'model', satellite)
+
+
+def _propagate_itrf(satellites, t):
+    """
+    Propagate satellites over the times in t with a single SatrecArray call.
     
-    time_offsets = np.arange(1, n_steps-1) * (60 * timestep_minutes)
-    time_offsets = time_offsets.tolist()
-    epochs = [t1 + timedelta(seconds=t) for t in time_offsets]
+    Returns ITRF positions in km with shape (n_sats, n_times, 3) and the
+    SGP4 error codes with shape (n_sats, n_times).
+    """
+    sat_array = SatrecArray([_satrec(sat) for sat in satellites])
+    jd, fr = jday(*t.utc)
+    e, r, _ = sat_array.sgp4(np.atleast_1d(np.asarray(jd, dtype=float)),
+                             np.atleast_1d(np.asarray(fr, dtype=float)))
     
-    ts = load.timescale()
-    ts_times = [ts.from_datetime(t) for t in epochs]
+    # TEME -> ITRF is a rotation about z by the Greenwich mean sidereal angle
+    theta, _ = theta_GMST1982(t.whole, t.ut1_fraction)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    r_itrf = np.empty_like(r)
+    r_itrf[..., 0] = cos_t * r[..., 0] + sin_t * r[..., 1]
+    r_itrf[..., 1] = cos_t * r[..., 1] - sin_t * r[..., 0]
+    r_itrf[..., 2] = r[..., 2]
     
-    positions = [satellite.at(t) for t in ts_times]
+    return r_itrf, e
+
+
+def propagate_all(satellites_dict, times, ts=None):
+    """
+    Propagate every satellite over times in a single SGP4 call.
+    
+    Returns ITRF positions in km with shape (n_sats, n_times, 3) and the SGP4
+    error codes, ready to pass as positions= to the DOP functions.
+    """
+    return _propagate_itrf(satellites_dict.values(), _to_time(times, ts or _TS))
+
+
+def _itrf_to_latlon(r_itrf):
+    """Geodetic latitude and longitude (degrees) of ITRF positions in km."""
+    x, y, z = r_itrf[..., 0], r_itrf[..., 1], r_itrf[..., 2]
+    p = np.hypot(x, y)
     
-    lat_lon = [wgs84.latlon_of(pos) for pos in positions]
-    latitudes = [ll[0].degrees for ll in lat_lon]
-    longitudes = [ll[1].degrees for ll in lat_lon]
+    lat = np.arctan2(z, p * (1 - WGS84_E2))
+    for _ in range(3):
+        sin_lat = np.sin(lat)
+        n = WGS84_A_KM / np.sqrt(1 - WGS84_E2 * sin_lat**2)
+        lat = np.arctan2(z + n * WGS84_E2 * sin_lat, p)
+    
+    return np.degrees(lat), np.degrees(np.arctan2(y, x))
+
+
+def _geo_box(epochs, latitudes, longitudes):
+    """Summarize a ground track as its bounding box."""
+    # Unwrap the track so a dateline crossing does not stretch the box
+    # across the whole globe; min_lon is kept in [-180, 180) and max_lon
+    # may then exceed 180 so that the box stays contiguous.
+    unwrapped = np.degrees(np.unwrap(np.radians(longitudes)))
+    min_lon = np.min(unwrapped)
+    shift = (min_lon + 180.0) // 360.0 * 360.0
     
     return {
         'epochs': epochs,
         'latitudes': latitudes,
         'longitudes': longitudes,
-        'min_lon': min(longitudes),
-        'max_lon': max(longitudes),
-        'mean_lon': statistics.mean(longitudes),
-        'min_lat': min(latitudes),
-        'max_lat': max(latitudes),
-        'mean_lat': statistics.mean(latitudes)
+        'min_lon': min_lon - shift,
+        'max_lon': np.max(unwrapped) - shift,
+        'mean_lon': (np.mean(unwrapped) + 180.0) % 360.0 - 180.0,
+        'min_lat': np.min(latitudes),
+        'max_lat': np.max(latitudes),
+        'mean_lat': np.mean(latitudes)
     }
 
 
+def get_geo_box_vectorized(satellite, epoch, timestep_minutes, prop_duration_days, ts=None):
+    """Calculate geographic bounding box for satellite propagation."""
+    t = _propagation_times(epoch, timestep_minutes, prop_duration_days, ts or _TS)
+    r_itrf, _ = _propagate_itrf([satellite], t)
+    latitudes, longitudes = _itrf_to_latlon(r_itrf[0])
+    
+    return _geo_box(t.utc_datetime(), latitudes, longitudes)
+
+
 def calculate_bounding_boxes(satellites_dict, reference_time, timestep_minutes=15, prop_duration_days=1.5):
     """Calculate bounding boxes for all satellites."""
     import streamlit as st
     
+    if not satellites_dict:
+        return {}
+    
+    # Propagate every satellite over the shared time grid in one SGP4 call
+    try:
+        t = _propagation_times(reference_time, timestep_minutes, prop_duration_days, _TS)
+        r_itrf, errors = _propagate_itrf(satellites_dict.values(), t)
+    except Exception as e:
+        st.warning(f"Could not calculate bounding boxes: {str(e)}")
+        return {}
+    
+    latitudes, longitudes = _itrf_to_latlon(r_itrf)
+    epochs = t.utc_datetime()
+    
     bounding_boxes = {}
     
-    for sat_name, sat_obj in satellites_dict.items():
-        try:
-            box_data = get_geo_box_vectorized(sat_obj, reference_time, timestep_minutes, prop_duration_days)
-            bounding_boxes[sat_name] = box_data
-        except Exception as e:
-            st.warning(f"Could not calculate bounding box for {sat_name}: {str(e)}")
+    for i, sat_name in enumerate(satellites_dict):
+        if errors[i].any():
+            error = SGP4_ERRORS[int(errors[i][errors[i] != 0][0])]
+            st.warning(f"Could not calculate bounding box for {sat_name}: {error}")
             continue
+        bounding_boxes[sat_name] = _geo_box(epochs, latitudes[i], longitudes[i])
     
     return bounding_boxes
 
 
 def get_dop_quality(gdop_value):
-    """Get DOP quality assessment based on GDOP value."""
-    from config import DOP_QUALITY_THRESHOLDS
-    
-    for quality, threshold in DOP_QUALITY_THRESHOLDS.items():
-        if gdop_value < threshold:
-            return quality
-    return "Poor"
+    """Get DOP quality assessment based on GDOP value (scalar or array)."""
+    quality = _DOP_QUALITY_LABELS[np.searchsorted(_DOP_QUALITY_BINS, gdop_value, side='right')]
+    return str(quality) if np.ndim(quality) == 0 else quality
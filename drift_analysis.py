@@ -3,6 +3,7 @@ Drift Analysis Module
 Handles longitudinal drift calculations and drift health assessment
 """
 
+from functools import lru_cache
 import numpy as np
 from config import GEOSYNC_MEAN_MOTION
 
@@ -24,16 +25,45 @@ def calculate_longitudinal_drift(mean_motion):
     return (mean_motion - GEOSYNC_MEAN_MOTION) * 360
 
 
+# Drift bands as multiples of the tolerance: a drift at or below bound i
+# (and above bound i-1) falls in band i, anything larger in the last band
+_GSO_BOUNDS = np.array([0.3, 1.0, 2.0, 5.0])
+_GSO_SCORES = np.array([100, 80, 60, 40, 0])
+_GSO_STATUS = np.array(["Excellent", "Good", "Fair", "Poor", "Critical"])
+_GSO_COLORS = np.array(["🟢", "🟢", "🟡", "🟠", "🔴"])
+
+_IGSO_BOUNDS = np.array([1.0, 2.0])
+_IGSO_SCORES = np.array([100, 70, 40])
+_IGSO_STATUS = np.array(["Normal", "Elevated", "High"])
+_IGSO_COLORS = np.array(["🟢", "🟡", "🟠"])
+
+
+def _band_index(abs_drift, tolerance, bounds):
+    """Band of each drift, counting the bounds it exceeds (NaN exceeds all)."""
+    return np.sum(~(abs_drift[..., None] <= tolerance[..., None] * bounds), axis=-1)
+
+
+@lru_cache(maxsize=1024)
+def _drift_health_scalar(abs_drift, is_gso, tolerance):
+    """Score, status and colour for one drift, memoized."""
+    if is_gso:
+        bounds, scores, status, colors = _GSO_BOUNDS, _GSO_SCORES, _GSO_STATUS, _GSO_COLORS
+    else:
+        bounds, scores, status, colors = _IGSO_BOUNDS, _IGSO_SCORES, _IGSO_STATUS, _IGSO_COLORS
+    band = int(np.sum(~(abs_drift <= tolerance * bounds)))
+    return int(scores[band]), str(status[band]), str(colors[band])
+
+
 def assess_drift_health(drift_deg_per_day, sat_type, drift_tolerance_gso=0.05, drift_tolerance_igso=2.0):
     """
     Assess drift health based on satellite type.
     
     Parameters:
     -----------
-    drift_deg_per_day : float
+    drift_deg_per_day : float or array-like
         Longitudinal drift in degrees/day
-    sat_type : str
-        'GSO' or 'IGSO'
+    sat_type : str or array-like
+        'GSO' or 'IGSO', broadcast against drift_deg_per_day
     drift_tolerance_gso : float
         Acceptable drift for GSO satellites (degrees/day)
     drift_tolerance_igso : float
@@ -42,45 +72,35 @@ def assess_drift_health(drift_deg_per_day, sat_type, drift_tolerance_gso=0.05, d
     Returns:
     --------
     dict : Drift assessment with score and status
+           (arrays when called with arrays, one entry per satellite)
     """
-    abs_drift = abs(drift_deg_per_day)
+    if np.ndim(drift_deg_per_day) == 0 and np.ndim(sat_type) == 0:
+        # Single satellite: Streamlit reruns repeat the same drift values,
+        # so the band lookup is memoized on the exact inputs
+        abs_drift = abs(float(drift_deg_per_day))
+        is_gso = bool(sat_type == 'GSO')
+        tolerance = drift_tolerance_gso if is_gso else drift_tolerance_igso
+        drift_score, drift_status, drift_color = _drift_health_scalar(
+            abs_drift, is_gso, float(tolerance)
+        )
+        return {
+            'drift_score': drift_score,
+            'drift_status': drift_status,
+            'drift_color': drift_color,
+            'abs_drift': abs_drift
+        }
+    
+    abs_drift = np.abs(np.asarray(drift_deg_per_day, dtype=float))
+    is_gso = np.asarray(sat_type) == 'GSO'
+    tolerance = np.where(is_gso, drift_tolerance_gso, drift_tolerance_igso)
+    abs_drift, is_gso, tolerance = np.broadcast_arrays(abs_drift, is_gso, tolerance)
     
-    if sat_type == 'GSO':
-        tolerance = drift_tolerance_gso
-        if abs_drift <= tolerance * 0.3:
-            drift_score = 100
-            drift_status = "Excellent"
-            drift_color = "🟢"
-        elif abs_drift <= tolerance:
-            drift_score = 80
-            drift_status = "Good"
-            drift_color = "🟢"
-        elif abs_drift <= tolerance * 2:
-            drift_score = 60
-            drift_status = "Fair"
-            drift_color = "🟡"
-        elif abs_drift <= tolerance * 5:
-            drift_score = 40
-            drift_status = "Poor"
-            drift_color = "🟠"
-        else:
-            drift_score = 0
-            drift_status = "Critical"
-            drift_color = "🔴"
-    else:  # IGSO
-        tolerance = drift_tolerance_igso
-        if abs_drift <= tolerance:
-            drift_score = 100
-            drift_status = "Normal"
-            drift_color = "🟢"
-        elif abs_drift <= tolerance * 2:
-            drift_score = 70
-            drift_status = "Elevated"
-            drift_color = "🟡"
-        else:
-            drift_score = 40
-            drift_status = "High"
-            drift_color = "🟠"
+    gso_band = _band_index(abs_drift, tolerance, _GSO_BOUNDS)
+    igso_band = _band_index(abs_drift, tolerance, _IGSO_BOUNDS)
+    
+    drift_score = np.where(is_gso, _GSO_SCORES[gso_band], _IGSO_SCORES[igso_band])
+    drift_status = np.where(is_gso, _GSO_STATUS[gso_band], _IGSO_STATUS[igso_band])
+    drift_color = np.where(is_gso, _GSO_COLORS[gso_band], _IGSO_COLORS[igso_band])
     
     return {
         'drift_score': drift_score,
@@ -90,34 +110,6 @@ def assess_drift_health(drift_deg_per_day, sat_type, drift_tolerance_gso=0.05, d
     }
 
 
-def calculate_drift_trend(sat_df, recent_window=7):
-    """
-    Calculate drift trend over time.
-    
-    Parameters:
-    -----------
-    sat_df : pandas.DataFrame
-        Satellite data with 'LonDrift_deg_per_day' column
-    recent_window : int
-        Number of recent data points to consider
-    
-    Returns:
-    --------
-    float : Drift trend (positive = increasing drift magnitude)
-    """
-    if len(sat_df) < 2:
-        return 0
-    
-    if len(sat_df) >= recent_window:
-        recent_drift = sat_df['LonDrift_deg_per_day'].iloc[-recent_window:].mean()
-        early_drift = sat_df['LonDrift_deg_per_day'].iloc[:recent_window].mean()
-    else:
-        recent_drift = sat_df['LonDrift_deg_per_day'].iloc[-1]
-        early_drift = sat_df['LonDrift_deg_per_day'].iloc[0]
-    
-    return abs(recent_drift) - abs(early_drift)
-
-
 def get_drift_direction(drift_value):
     """
     Get drift direction string.
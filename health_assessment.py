@@ -6,19 +6,82 @@ Comprehensive health assessment for NavIC satellites including drift analysis
 import numpy as np
 import pandas as pd
 from config import NAVIK_SERVICE_REQUIREMENTS
-from drift_analysis import assess_drift_health, calculate_drift_trend
+from drift_analysis import assess_drift_health
 from maneuver_detection import calculate_maneuver_uniformity
 
 
-def assess_satellite_health_with_drift(sat_name, sat_df, maneuver_events, inc_tolerance, 
+def aggregate_satellite_stats(df_all, recent_window=7):
+    """
+    Aggregate the per-satellite statistics used by the drift summary,
+    classification and health assessment.
+    
+    Parameters:
+    -----------
+    df_all : pandas.DataFrame
+        Concatenated satellite data with a 'satellite' column, each
+        satellite's rows in EPOCH order
+    recent_window : int
+        Number of early/recent data points used for the drift trend
+    
+    Returns:
+    --------
+    pandas.DataFrame : One row of statistics per satellite, indexed by name
+    """
+    aggregations = {
+        'incl_mean': ('INCLINATION', 'mean'),
+        'incl_std': ('INCLINATION', 'std'),
+        'epoch_min': ('EPOCH', 'min'),
+        'epoch_max': ('EPOCH', 'max'),
+        'n_epochs': ('EPOCH', 'size'),
+    }
+    if 'altitude_km' in df_all.columns:
+        aggregations['alt_mean'] = ('altitude_km', 'mean')
+    has_drift = 'LonDrift_deg_per_day' in df_all.columns
+    if has_drift:
+        aggregations.update({
+            'drift_mean': ('LonDrift_deg_per_day', 'mean'),
+            'drift_std': ('LonDrift_deg_per_day', 'std'),
+        })
+    
+    grouped = df_all.groupby('satellite', sort=True, observed=True)
+    stats = grouped.agg(**aggregations)
+    
+    if has_drift:
+        # Positional first/last rows (a NaN newest drift stays NaN, unlike the
+        # NaN-skipping 'first'/'last' aggregations)
+        stats['drift_first'] = grouped.head(1).set_index('satellite')['LonDrift_deg_per_day']
+        stats['drift_current'] = grouped.tail(1).set_index('satellite')['LonDrift_deg_per_day']
+        
+        # Drift trend: change in |drift| between the first and last
+        # recent_window points (single points for shorter histories)
+        early_mean = grouped.head(recent_window).groupby('satellite', observed=True)['LonDrift_deg_per_day'].mean()
+        recent_mean = grouped.tail(recent_window).groupby('satellite', observed=True)['LonDrift_deg_per_day'].mean()
+        
+        windowed = stats['n_epochs'] >= recent_window
+        early_drift = early_mean.where(windowed, stats['drift_first'])
+        recent_drift = recent_mean.where(windowed, stats['drift_current'])
+        stats['drift_trend'] = (recent_drift.abs() - early_drift.abs()).where(stats['n_epochs'] >= 2, 0)
+    
+    return stats
+
+
+def assess_satellite_health_with_drift(sat_name, sat_stats, maneuver_events, inc_tolerance, 
                                        min_man_per_month, max_man_per_month, uniformity_threshold,
                                        drift_tolerance_gso=0.05):
-    """Comprehensive health assessment for a satellite including drift analysis."""
+    """
+    Comprehensive health assessment for a satellite including drift analysis.
+    
+    sat_stats is the satellite's row from aggregate_satellite_stats; a
+    DataFrame of the satellite's history is also accepted and aggregated here.
+    """
+    if isinstance(sat_stats, pd.DataFrame):
+        sat_stats = aggregate_satellite_stats(sat_stats.assign(satellite=sat_name)).iloc[0]
+    
     requirements = NAVIK_SERVICE_REQUIREMENTS.get(sat_name, {})
     target_inclination = requirements.get("inclination", None)
     
-    mean_inclination = sat_df['INCLINATION'].mean()
-    std_inclination = sat_df['INCLINATION'].std()
+    mean_inclination = sat_stats['incl_mean']
+    std_inclination = sat_stats['incl_std']
     
     # Determine satellite type
     if 0.0 < mean_inclination < 10.0:
@@ -28,7 +91,7 @@ def assess_satellite_health_with_drift(sat_name, sat_df, maneuver_events, inc_to
     else:
         sat_type = 'Unclassified'
     
-    observation_days = (sat_df['EPOCH'].max() - sat_df['EPOCH'].min()).days
+    observation_days = (sat_stats['epoch_max'] - sat_stats['epoch_min']).days
     observation_months = observation_days / 30.0
     
     num_maneuvers = len(maneuver_events)
@@ -59,8 +122,10 @@ def assess_satellite_health_with_drift(sat_name, sat_df, maneuver_events, inc_to
     
     # Uniformity score with better weighting
     if num_maneuvers >= 2:
-        maneuver_dates = pd.to_datetime(maneuver_events['EPOCH']).tolist()
-        uniformity_cov = calculate_maneuver_uniformity(maneuver_dates)
+        maneuver_dates = maneuver_events['EPOCH']
+        if not pd.api.types.is_datetime64_any_dtype(maneuver_dates):
+            maneuver_dates = pd.to_datetime(maneuver_dates)
+        uniformity_cov = calculate_maneuver_uniformity(maneuver_dates.values)
         
         if uniformity_cov is not None and uniformity_cov <= uniformity_threshold:
             uniformity_score = 100
@@ -77,13 +142,11 @@ def assess_satellite_health_with_drift(sat_name, sat_df, maneuver_events, inc_to
         uniformity_cov = None
     
     # Enhanced DRIFT ANALYSIS
-    if 'LonDrift_deg_per_day' in sat_df.columns:
-        mean_drift = sat_df['LonDrift_deg_per_day'].mean()
-        std_drift = sat_df['LonDrift_deg_per_day'].std()
-        current_drift = sat_df['LonDrift_deg_per_day'].iloc[-1]
-        
-        # Calculate drift trend
-        drift_trend = calculate_drift_trend(sat_df)
+    if 'drift_mean' in sat_stats:
+        mean_drift = sat_stats['drift_mean']
+        std_drift = sat_stats['drift_std']
+        current_drift = sat_stats['drift_current']
+        drift_trend = sat_stats['drift_trend']
         
         # Base drift assessment
         drift_assessment = assess_drift_health(mean_drift, sat_type, drift_tolerance_gso)
@@ -4,6 +4,7 @@ Streamlit-based interface for satellite monitoring and analysis
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import date, datetime
 from datetime import timezone
@@ -11,13 +12,16 @@ from skyfield.api import load
 
 # Import our modular components
 from config import (
-    NAVIK_SATS, INDIA_EXTREME_POINTS, INACTIVE_SATELLITES, DEFAULT_PARAMS
+    NAVIK_SATS, INDIA_EXTREME_POINTS, INACTIVE_SATELLITES, DEFAULT_PARAMS, AnalysisConfig
 )
-from spacetrack_api import fetch_and_classify_satellite, fetch_multiple_tles
+from spacetrack_api import classify_gp_history
+from cached_api import cached_fetch_gp_histories, cached_fetch_multiple_tles, cached_parse_tle_data
 from drift_analysis import assess_drift_health, get_drift_direction
 from maneuver_detection import detect_navik_maneuvers
-from health_assessment import assess_satellite_health_with_drift
-from dop_calculations import parse_tle_data, calculate_dop_for_location, get_dop_quality
+from health_assessment import assess_satellite_health_with_drift, aggregate_satellite_stats
+from dop_calculations import (
+    calculate_dop_for_location, calculate_dop_batch, get_dop_quality, propagate_all
+)
 from visualization import (
     plot_individual_satellites, plot_combined_drift, plot_bounding_boxes,
     plot_sky_plot, plot_dop_over_time, plot_combined_inclination,
@@ -85,9 +89,29 @@ if use_custom_location:
     custom_lon = st.sidebar.number_input("Longitude (°)", min_value=-180.0, max_value=180.0, 
                                          value=77.1, step=0.1, format="%.3f")
 
+# Widget values for this run, gathered once
+cfg = AnalysisConfig(
+    z_threshold=z_threshold,
+    sma_threshold=sma_threshold,
+    inc_threshold=inc_threshold,
+    persist_window=int(persist_window),
+    inclination_tolerance=inclination_tolerance,
+    drift_tolerance_gso=drift_tolerance_gso,
+    min_maneuvers_per_month=min_maneuvers_per_month,
+    max_maneuvers_per_month=max_maneuvers_per_month,
+    maneuver_uniformity_threshold=maneuver_uniformity_threshold,
+    elevation_mask_deg=elevation_mask_deg
+)
+
 # Inactive satellites toggle
 include_inactive_sats = st.sidebar.checkbox("Include inactive satellites (IRNSS-1B, 1C, 1D) in DOP", value=False)
 
+# Ground track map toggle (off falls back to the SVG geo projection)
+map_tiles = st.sidebar.checkbox("Draw ground tracks on WebGL map tiles", value=True)
+
+# DOP time series toggle (off serves a static PNG when kaleido is installed)
+interactive_dop = st.sidebar.checkbox("Interactive DOP plot", value=False)
+
 # ==================== MAIN ANALYSIS ====================
 
 # Main Analysis Button
@@ -99,25 +123,30 @@ if st.button("🚀 Fetch NavIC Data & Run Analysis", type="primary"):
             all_dfs = []
             errors = {}
             
+            # One Space-Track query returns the GP history of every satellite;
+            # if it fails, every satellite reports that error
+            try:
+                histories = cached_fetch_gp_histories(
+                    NAVIK_SATS.values(), start_date_str, end_date_str, username, password
+                )
+            except Exception as e:
+                histories = {}
+                errors = {sat_name: str(e) for sat_name in NAVIK_SATS}
+            
             for sat_name, norad in NAVIK_SATS.items():
+                if sat_name in errors:
+                    continue
                 try:
-                    df = fetch_and_classify_satellite(
-                        norad_id=int(norad),
-                        start_date=start_date_str,
-                        end_date=end_date_str,
-                        username=username,
-                        password=password,
-                        igso_min=10,
-                        deviation_tol=0.3
-                    )
+                    df = classify_gp_history(histories[int(norad)], norad, igso_min=10, deviation_tol=0.3)
 
-                    df['EPOCH'] = pd.to_datetime(df['EPOCH'])
+                    # classify_gp_history already parsed EPOCH
+                    assert pd.api.types.is_datetime64_any_dtype(df['EPOCH'])
                     df = df.sort_values('EPOCH').reset_index(drop=True)
 
                     if daily_only:
-                        df['date'] = df['EPOCH'].dt.date
-                        df = df.sort_values('EPOCH').groupby('date', as_index=False).first()
-                        df['EPOCH'] = pd.to_datetime(df['EPOCH'])
+                        # Already sorted by EPOCH, so the first row of each day is kept
+                        df['date'] = df['EPOCH'].values.astype('datetime64[D]')
+                        df = df.drop_duplicates(subset='date', keep='first').drop(columns='date').reset_index(drop=True)
 
                     df['satellite'] = sat_name
 
@@ -138,6 +167,8 @@ if st.button("🚀 Fetch NavIC Data & Run Analysis", type="primary"):
                 st.error("❌ No data fetched for any satellite.")
             else:
                 df_all = pd.concat(all_dfs, ignore_index=True, sort=False)
+                # Low-cardinality labels as categoricals, so groupby/sort work on integer codes
+                df_all = df_all.astype({'satellite': 'category', 'type': 'category'})
                 
                 # Store in session state
                 st.session_state['df_all'] = df_all
@@ -155,41 +186,40 @@ if st.session_state.get('analysis_complete', False):
     # ==================== DRIFT SUMMARY ====================
     st.header("🌍 Longitudinal Drift Analysis")
     
+    # Per-satellite statistics shared by the summaries below, one groupby
+    sat_stats = aggregate_satellite_stats(df_all)
+    
     drift_summary = []
-    for sat_name in sorted(df_all['satellite'].unique()):
-        sat_df = df_all[df_all['satellite'] == sat_name].copy()
+    if 'LonDrift_deg_per_day' in df_all.columns:
+        sat_names = sat_stats.index
+        mean_drift = sat_stats['drift_mean'].to_numpy()
+        std_drift = sat_stats['drift_std'].to_numpy()
+        current_drift = sat_stats['drift_current'].to_numpy()
+        mean_incl = sat_stats['incl_mean'].to_numpy()
         
-        if 'LonDrift_deg_per_day' in sat_df.columns:
-            mean_drift = sat_df['LonDrift_deg_per_day'].mean()
-            current_drift = sat_df['LonDrift_deg_per_day'].iloc[-1]
-            std_drift = sat_df['LonDrift_deg_per_day'].std()
-            
-            # Determine satellite type
-            mean_incl = sat_df['INCLINATION'].mean()
-            if 0.0 < mean_incl < 10.0:
-                sat_type = 'GSO'
-            else:
-                sat_type = 'IGSO'
-            
-            drift_assessment = assess_drift_health(mean_drift, sat_type, drift_tolerance_gso)
-            
-            drift_direction = get_drift_direction(mean_drift)
+        # Determine satellite type
+        sat_types = np.where((mean_incl > 0.0) & (mean_incl < 10.0), 'GSO', 'IGSO')
+        
+        drift_assessment = assess_drift_health(mean_drift, sat_types, cfg.drift_tolerance_gso)
+        
+        for i, sat_name in enumerate(sat_names):
+            drift_direction = get_drift_direction(mean_drift[i])
             
             drift_summary.append({
                 'Satellite': sat_name,
-                'Type': sat_type,
-                'Mean Drift (°/day)': round(mean_drift, 4),
-                'Current Drift (°/day)': round(current_drift, 4),
-                'Std Dev (°/day)': round(std_drift, 4),
+                'Type': sat_types[i],
+                'Mean Drift (°/day)': round(mean_drift[i], 4),
+                'Current Drift (°/day)': round(current_drift[i], 4),
+                'Std Dev (°/day)': round(std_drift[i], 4),
                 'Direction': drift_direction,
-                'Drift Status': f"{drift_assessment['drift_color']} {drift_assessment['drift_status']}",
-                'Drift Score': round(drift_assessment['drift_score'], 1)
+                'Drift Status': f"{drift_assessment['drift_color'][i]} {drift_assessment['drift_status'][i]}",
+                'Drift Score': round(int(drift_assessment['drift_score'][i]), 1)
             })
     
     drift_summary_df = pd.DataFrame(drift_summary)
     st.dataframe(drift_summary_df, hide_index=True, use_container_width=True)
     
-    st.caption(f"**GSO Drift Tolerance:** ±{drift_tolerance_gso}°/day | Positive = Eastward, Negative = Westward")
+    st.caption(f"**GSO Drift Tolerance:** ±{cfg.drift_tolerance_gso}°/day | Positive = Eastward, Negative = Westward")
     
     st.divider()
     
@@ -197,42 +227,46 @@ if st.session_state.get('analysis_complete', False):
     st.header("🏥 Satellite Health Assessment (with Drift)")
     
     maneuver_summary = []
-    all_maneuvers_df = pd.DataFrame()
     health_assessments = []
     
-    for sat_name in sorted(df_all['satellite'].unique()):
-        sat_df = df_all[df_all['satellite'] == sat_name].copy()
-        
-        sat_detected = detect_navik_maneuvers(
+    # Run maneuver detection for every satellite in a single groupby split
+    detected_all = (
+        df_all.drop(columns='satellite')
+        .groupby(df_all['satellite'], sort=True, observed=True, group_keys=True)
+        .apply(lambda sat_df: detect_navik_maneuvers(
             sat_df,
             sma_col='SEMIMAJOR_AXIS',
             inc_col='INCLINATION',
-            z_thresh=z_threshold,
-            sma_abs_thresh_km=sma_threshold,
-            inc_abs_thresh_deg=inc_threshold,
-            persist_window=int(persist_window)
-        )
-        
-        ew_maneuvers = int(sat_detected['EW_MANEUVER'].sum()) if 'EW_MANEUVER' in sat_detected.columns else 0
-        ns_maneuvers = int(sat_detected['NS_MANEUVER'].sum()) if 'NS_MANEUVER' in sat_detected.columns else 0
+            z_thresh=cfg.z_threshold,
+            sma_abs_thresh_km=cfg.sma_threshold,
+            inc_abs_thresh_deg=cfg.inc_threshold,
+            persist_window=cfg.persist_window
+        ))
+        .reset_index(level=0)
+        .reset_index(drop=True)
+    )
+    maneuver_counts = detected_all.groupby('satellite', sort=True, observed=True)[['EW_MANEUVER', 'NS_MANEUVER']].sum()
+    all_maneuvers_df = detected_all[detected_all['MANEUVER']].reset_index(drop=True)
+    
+    for sat_name, sat_detected in detected_all.groupby('satellite', sort=True, observed=True):
+        ew_maneuvers = int(maneuver_counts.at[sat_name, 'EW_MANEUVER'])
+        ns_maneuvers = int(maneuver_counts.at[sat_name, 'NS_MANEUVER'])
         
-        maneuver_events = sat_detected[sat_detected['MANEUVER']].copy()
-        maneuver_events['satellite'] = sat_name
-        all_maneuvers_df = pd.concat([all_maneuvers_df, maneuver_events], ignore_index=True)
+        maneuver_events = sat_detected[sat_detected['MANEUVER']]
         
         maneuver_summary.append({
             'Satellite': sat_name,
             'E-W Maneuvers': ew_maneuvers,
             'N-S Maneuvers': ns_maneuvers,
             'Total Maneuvers': ew_maneuvers + ns_maneuvers,
-            'Observation Period (days)': (sat_df['EPOCH'].max() - sat_df['EPOCH'].min()).days
+            'Observation Period (days)': (sat_stats.at[sat_name, 'epoch_max'] - sat_stats.at[sat_name, 'epoch_min']).days
         })
         
         health_data = assess_satellite_health_with_drift(
-            sat_name, sat_df, maneuver_events,
-            inclination_tolerance, min_maneuvers_per_month,
-            max_maneuvers_per_month, maneuver_uniformity_threshold,
-            drift_tolerance_gso
+            sat_name, sat_stats.loc[sat_name], maneuver_events,
+            cfg.inclination_tolerance, cfg.min_maneuvers_per_month,
+            cfg.max_maneuvers_per_month, cfg.maneuver_uniformity_threshold,
+            cfg.drift_tolerance_gso
         )
         health_assessments.append(health_data)
     
@@ -263,28 +297,17 @@ if st.session_state.get('analysis_complete', False):
     # ==================== SATELLITE CLASSIFICATION ====================
     st.header("🔍 Satellite Classification")
     
-    sat_summary = []
-    for sat_name in sorted(df_all['satellite'].unique()):
-        sub = df_all[df_all['satellite'] == sat_name]
-        mean_incl = sub['INCLINATION'].mean() if not sub.empty else float('nan')
-        mean_alt = sub['altitude_km'].mean() if not sub.empty and 'altitude_km' in sub.columns else float('nan')
-        mean_drift = sub['LonDrift_deg_per_day'].mean() if 'LonDrift_deg_per_day' in sub.columns else float('nan')
-        
-        if 0.0 < mean_incl < 10.0:
-            sat_type = 'GSO'
-        elif mean_incl >= 10.0:
-            sat_type = 'IGSO'
-        else:
-            sat_type = 'Unclassified'
-        
-        sat_summary.append({
-            'Satellite': sat_name,
-            'Mean Inclination (°)': round(mean_incl, 3) if not sub.empty else None,
-            'Mean Altitude (km)': round(mean_alt, 2) if not pd.isna(mean_alt) else None,
-            'Mean Drift (°/day)': round(mean_drift, 4) if not pd.isna(mean_drift) else None,
-            'Classified Type': sat_type
-        })
-    sat_summary_df = pd.DataFrame(sat_summary)
+    mean_incl = sat_stats['incl_mean']
+    sat_summary_df = pd.DataFrame({
+        'Satellite': sat_stats.index,
+        'Mean Inclination (°)': mean_incl.round(3).to_numpy(),
+        'Mean Altitude (km)': sat_stats['alt_mean'].round(2).to_numpy() if 'alt_mean' in sat_stats else np.nan,
+        'Mean Drift (°/day)': sat_stats['drift_mean'].round(4).to_numpy() if 'drift_mean' in sat_stats else np.nan,
+        'Classified Type': np.select(
+            [(mean_incl > 0.0) & (mean_incl < 10.0), mean_incl >= 10.0],
+            ['GSO', 'IGSO'], default='Unclassified'
+        )
+    })
     st.dataframe(sat_summary_df, hide_index=True, use_container_width=True)
     
     st.divider()
@@ -293,7 +316,7 @@ if st.session_state.get('analysis_complete', False):
     st.header("🛠️ Maneuver Summary")
     
     maneuver_summary_df = pd.DataFrame(maneuver_summary)
-    st.caption(f"Detection settings: Z-score ≥ {z_threshold}, SMA ≥ {sma_threshold} km, Inclination ≥ {inc_threshold}°, Window = {int(persist_window)}")
+    st.caption(f"Detection settings: Z-score ≥ {cfg.z_threshold}, SMA ≥ {cfg.sma_threshold} km, Inclination ≥ {cfg.inc_threshold}°, Window = {cfg.persist_window}")
     st.dataframe(maneuver_summary_df, hide_index=True, use_container_width=True)
     
     st.divider()
@@ -304,12 +327,12 @@ if st.session_state.get('analysis_complete', False):
     with st.spinner("🔄 Fetching latest TLE data for DOP calculations..."):
         try:
             norad_ids = list(NAVIK_SATS.values())
-            tle_data = fetch_multiple_tles(norad_ids, username, password)
+            tle_data = cached_fetch_multiple_tles(norad_ids, username, password)
             
             if not tle_data:
                 st.error("❌ Failed to fetch TLE data for DOP calculations")
             else:
-                satellites = parse_tle_data(tle_data, NAVIK_SATS)
+                satellites = cached_parse_tle_data(tle_data, NAVIK_SATS)
                 
                 if len(satellites) == 0:
                     st.error("❌ No satellites parsed from TLE data")
@@ -327,6 +350,11 @@ if st.session_state.get('analysis_complete', False):
                     current_time = datetime.utcnow().replace(tzinfo=timezone.utc)
                     st.caption(f"Calculation Time (UTC): {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     
+                    # One Time object and one ephemeris shared by every location below
+                    t_now = ts.utc(current_time.year, current_time.month, current_time.day,
+                                   current_time.hour, current_time.minute, current_time.second)
+                    positions = propagate_all(satellites, t_now)
+                    
                     dop_results = []
                     last_sat_positions = None
                     last_location_meta = None
@@ -335,7 +363,8 @@ if st.session_state.get('analysis_complete', False):
                         lat, lon = float(custom_lat), float(custom_lon)
                         location_name = f"Custom ({lat:.3f}, {lon:.3f})"
                         dop, visible_sats, sat_positions = calculate_dop_for_location(
-                            satellites, lat, lon, current_time, elevation_mask_deg=elevation_mask_deg
+                            satellites, lat, lon, t_now, elevation_mask_deg=cfg.elevation_mask_deg,
+                            positions=positions
                         )
                         last_sat_positions = sat_positions
                         last_location_meta = {'name': location_name, 'lat': lat, 'lon': lon}
@@ -369,10 +398,20 @@ if st.session_state.get('analysis_complete', False):
                                 'Quality': 'N/A'
                             })
                     else:
-                        for location_name, (lat, lon) in INDIA_EXTREME_POINTS.items():
-                            dop, visible_sats, sat_positions = calculate_dop_for_location(
-                                satellites, lat, lon, current_time, elevation_mask_deg=elevation_mask_deg
-                            )
+                        # Evaluate all extreme points in a single batched DOP calculation
+                        extreme_lats, extreme_lons = zip(*INDIA_EXTREME_POINTS.values())
+                        dop_batch = calculate_dop_batch(
+                            satellites, extreme_lats, extreme_lons, t_now,
+                            elevation_mask_deg=cfg.elevation_mask_deg, positions=positions
+                        )
+                        
+                        for i, (location_name, (lat, lon)) in enumerate(INDIA_EXTREME_POINTS.items()):
+                            n_visible = int(dop_batch['visible'][i, 0])
+                            if np.isfinite(dop_batch['GDOP'][i, 0]):
+                                dop = {key: float(dop_batch[key][i, 0])
+                                       for key in ('GDOP', 'PDOP', 'HDOP', 'VDOP', 'TDOP')}
+                            else:
+                                dop = None
                             
                             if dop:
                                 quality = get_dop_quality(dop['GDOP'])
@@ -381,7 +420,7 @@ if st.session_state.get('analysis_complete', False):
                                     'Location': location_name,
                                     'Latitude': lat,
                                     'Longitude': lon,
-                                    'Visible Sats': len(visible_sats),
+                                    'Visible Sats': n_visible,
                                     'GDOP': round(dop['GDOP'], 2),
                                     'PDOP': round(dop['PDOP'], 2),
                                     'HDOP': round(dop['HDOP'], 2),
@@ -394,7 +433,7 @@ if st.session_state.get('analysis_complete', False):
                                     'Location': location_name,
                                     'Latitude': lat,
                                     'Longitude': lon,
-                                    'Visible Sats': len(visible_sats),
+                                    'Visible Sats': n_visible,
                                     'GDOP': None,
                                     'PDOP': None,
                                     'HDOP': None,
@@ -407,13 +446,13 @@ if st.session_state.get('analysis_complete', False):
                     st.dataframe(dop_df, hide_index=True, use_container_width=True)
                     
                     st.caption("**DOP Quality Guide:** Excellent: <2 | Good: 2-4 | Moderate: 4-6 | Fair: 6-8 | Poor: >8")
-                    st.caption(f"Elevation mask: {elevation_mask_deg}°")
+                    st.caption(f"Elevation mask: {cfg.elevation_mask_deg}°")
                     
                     # Store for plotting
                     st.session_state['satellites_dop'] = satellites
                     st.session_state['dop_results'] = dop_results
                     st.session_state['current_time'] = current_time
-                    st.session_state['elevation_mask_deg'] = elevation_mask_deg
+                    st.session_state['elevation_mask_deg'] = cfg.elevation_mask_deg
                     if last_sat_positions is not None and last_location_meta is not None:
                         st.session_state['last_sat_positions'] = last_sat_positions
                         st.session_state['last_location_meta'] = last_location_meta
@@ -431,18 +470,22 @@ if st.session_state.get('analysis_complete', False):
     if show_plots or st.session_state.get('show_plots', False):
         st.session_state['show_plots'] = True
         
+        # Rows with drift / altitude, filtered once and shared by the plots below
+        drift_df = df_all[df_all['LonDrift_deg_per_day'].notna()] if 'LonDrift_deg_per_day' in df_all.columns else None
+        alt_df = df_all[df_all['altitude_km'].notna()] if 'altitude_km' in df_all.columns else None
+        
         # Individual satellite plots
         plot_individual_satellites(df_all)
         
         # Combined drift plot
-        plot_combined_drift(df_all)
+        plot_combined_drift(df_all, drift_df)
         
         # Satellite bounding box plots
         if st.session_state.get('satellites_dop') and st.session_state.get('current_time'):
             satellites = st.session_state['satellites_dop']
             reference_time = st.session_state['current_time']
             
-            plot_bounding_boxes(satellites, reference_time)
+            plot_bounding_boxes(satellites, reference_time, map_tiles=map_tiles)
         else:
             st.info("Bounding box plots require DOP analysis data. Please ensure DOP analysis completed successfully.")
         
@@ -451,7 +494,7 @@ if st.session_state.get('analysis_complete', False):
             sat_positions = st.session_state['last_sat_positions']
             loc_meta = st.session_state['last_location_meta']
             satellites = st.session_state['satellites_dop']
-            elevation_mask = st.session_state.get('elevation_mask_deg', elevation_mask_deg)
+            elevation_mask = st.session_state.get('elevation_mask_deg', cfg.elevation_mask_deg)
             
             plot_sky_plot(satellites, sat_positions, loc_meta, elevation_mask)
 
@@ -467,13 +510,13 @@ if st.session_state.get('analysis_complete', False):
             
             if use_custom_location or selected_location:
                 plot_dop_over_time(satellites, use_custom_location, custom_lat, custom_lon, 
-                                  elevation_mask_deg, selected_location)
+                                  cfg.elevation_mask_deg, selected_location, interactive=interactive_dop)
         
         # Combined plots
         plot_combined_inclination(df_all)
-        plot_combined_altitude(df_all)
-        plot_drift_distribution(df_all)
-        plot_drift_vs_altitude(df_all)
+        plot_combined_altitude(df_all, alt_df)
+        plot_drift_distribution(df_all, drift_df)
+        plot_drift_vs_altitude(df_all, drift_df)
 
 else:
     st.info("👆 Click the button in the sidebar to start the analysis")
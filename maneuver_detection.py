@@ -3,110 +3,201 @@ Maneuver Detection Module
 Handles detection of orbital maneuvers using statistical analysis
 """
 
+import warnings
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba is optional; kernels then run as plain NumPy
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 
 def rolling_median_safe(s, window=3):
-    """Compute rolling median with fallback for edge cases."""
+    """Compute rolling median of a Series or DataFrame with fallback for edge cases."""
     return s.astype(float).rolling(window=window, min_periods=1, center=True).median()
 
 
+def _pre_median(x, half):
+    """Median of x over the half+1 values ending half values before each one."""
+    pre = np.full(len(x), np.nan)
+    if len(x) > half:
+        # Windows of half+1 values ending at 0..n-half-1, NaN-padded at the start
+        padded = np.concatenate([np.full(half, np.nan), x[:len(x) - half]])
+        windows = sliding_window_view(padded, half + 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN windows
+            pre[half:] = np.nanmedian(windows, axis=1)
+    return pre
+
+
+def _post_median(x, half):
+    """Median of x over the half+1 values starting at each one (NaN past the end)."""
+    post = np.full(len(x), np.nan)
+    if len(x) > half:
+        post[:len(x) - half] = np.median(sliding_window_view(x, half + 1), axis=1)
+    return post
+
+
 def mad_zscore(x, threshold=1e-9):
     """Robust z-score using Median Absolute Deviation (MAD)."""
-    x = np.array(x, dtype=float)
-    med = np.nanmedian(x)
-    mad = np.nanmedian(np.abs(x - med))
-    
-    if mad < threshold or np.isnan(mad):
-        mean = np.nanmean(x)
-        std = np.nanstd(x)
-        if std < threshold or np.isnan(std):
+    return _mad_zscore_kernel(np.asarray(x, dtype=np.float64), threshold)
+
+
+@njit(cache=True)
+def _mad_zscore_kernel(x, threshold):
+    """MAD z-score of a float array, NaNs dropped once up front and kept in the output."""
+    finite = x[~np.isnan(x)]
+    if finite.size == 0:
+        return np.zeros_like(x)
+    
+    med = np.median(finite)
+    mad = np.median(np.abs(finite - med))
+    
+    if mad < threshold:
+        mean = finite.mean()
+        std = np.sqrt(np.mean((finite - mean) ** 2))
+        if std < threshold:
             return np.zeros_like(x)
         return (x - mean) / std
     
     return 0.6745 * (x - med) / mad
 
 
+@njit(cache=True)
+def _nan_median(window):
+    """Median of the non-NaN values of window, NaN if there are none."""
+    values = window[~np.isnan(window)]
+    if values.size == 0:
+        return np.nan
+    return np.median(values)
+
+
+@njit(cache=True)
+def _detect_core(x, z_thresh, abs_thresh, half):
+    """
+    Compiled maneuver detection for one element series.
+    
+    Mirrors the pandas path of detect_navik_maneuvers: centred 3-point
+    smoothing, first difference, MAD z-score candidates and the pre/post
+    window medians (left NaN when there are no candidates). Returns (smooth, diff, z, candidate, pre_med, post_med,
+    maneuver) arrays.
+    """
+    n = len(x)
+    
+    smooth = np.empty(n)
+    for i in range(n):
+        smooth[i] = _nan_median(x[max(0, i - 1):min(n, i + 2)])
+    
+    diff = np.empty(n)
+    if n:
+        diff[0] = np.nan
+    diff[1:] = smooth[1:] - smooth[:-1]
+    
+    z = _mad_zscore_kernel(np.where(np.isnan(diff), 0.0, diff), 1e-9)
+    candidate = (np.abs(diff) >= abs_thresh) & (np.abs(z) >= z_thresh)
+    
+    pre_med = np.full(n, np.nan)
+    post_med = np.full(n, np.nan)
+    if not candidate.any():
+        # Nothing to confirm, so the window medians are not needed
+        return smooth, diff, z, candidate, pre_med, post_med, candidate.copy()
+    
+    for i in range(half, n):
+        pre_med[i] = _nan_median(smooth[max(0, i - 2 * half):i - half + 1])
+    
+    for i in range(n - half):
+        window = smooth[i:i + half + 1]
+        if not np.isnan(window).any():
+            post_med[i] = np.median(window)
+    
+    maneuver = candidate & (np.abs(post_med - pre_med) >= abs_thresh)
+    
+    return smooth, diff, z, candidate, pre_med, post_med, maneuver
+
+
 def detect_navik_maneuvers(df, sma_col='SEMIMAJOR_AXIS', inc_col='INCLINATION',
                            z_thresh=3.5, sma_abs_thresh_km=0.5, inc_abs_thresh_deg=0.01,
                            persist_window=2):
     """Detects orbital maneuvers for NavIC satellites."""
-    df2 = df.copy().reset_index(drop=True)
-    
-    for c in [sma_col, inc_col]:
-        if c in df2.columns:
-            df2[c] = pd.to_numeric(df2[c], errors='coerce')
-    
-    if sma_col in df2.columns:
-        df2[sma_col + '_smooth'] = rolling_median_safe(df2[sma_col], window=3)
-    if inc_col in df2.columns:
-        df2[inc_col + '_smooth'] = rolling_median_safe(df2[inc_col], window=3)
-    
-    df2['dSMA'] = df2[sma_col + '_smooth'].diff() if sma_col + '_smooth' in df2 else np.nan
-    df2['dINC'] = df2[inc_col + '_smooth'].diff() if inc_col + '_smooth' in df2 else np.nan
-    
-    df2['z_dSMA'] = mad_zscore(df2['dSMA'].fillna(0))
-    df2['z_dINC'] = mad_zscore(df2['dINC'].fillna(0))
-    
-    df2['SMA_candidate'] = False
-    if 'dSMA' in df2.columns and 'z_dSMA' in df2.columns:
-        df2.loc[
-            (df2['dSMA'].abs() >= sma_abs_thresh_km) & (df2['z_dSMA'].abs() >= z_thresh),
-            'SMA_candidate'
-        ] = True
-    
-    # E-W maneuver detection based on SMA changes only
-    df2['EW_candidate'] = df2['SMA_candidate'].copy()
+    base = df.reset_index(drop=True)
+    n = len(base)
     
-    df2['INC_candidate'] = False
-    if 'dINC' in df2.columns and 'z_dINC' in df2.columns:
-        df2.loc[
-            (df2['dINC'].abs() >= inc_abs_thresh_deg) & (df2['z_dINC'].abs() >= z_thresh),
-            'INC_candidate'
-        ] = True
+    cols = [c for c in [sma_col, inc_col] if c in base.columns]
+    if cols:
+        base[cols] = base[cols].apply(pd.to_numeric, errors='coerce')
     
     half = persist_window
     
-    df2['pre_sma_med'] = df2[sma_col + '_smooth'].rolling(
-        window=2*half+1, min_periods=1, center=False
-    ).apply(
-        lambda arr: np.median(arr[:-half]) if len(arr) > half else np.nan, raw=True
-    )
-    df2['post_sma_med'] = df2[sma_col + '_smooth'].shift(-half).rolling(
-        window=2*half+1, min_periods=1, center=False
-    ).apply(
-        lambda arr: np.median(arr[half:]) if len(arr) > half else np.nan, raw=True
-    )
-    df2['sma_med_delta'] = (df2['post_sma_med'] - df2['pre_sma_med']).abs()
-    
-    df2['pre_inc_med'] = df2[inc_col + '_smooth'].rolling(
-        window=2*half+1, min_periods=1, center=False
-    ).apply(
-        lambda arr: np.median(arr[:-half]) if len(arr) > half else np.nan, raw=True
-    )
-    df2['post_inc_med'] = df2[inc_col + '_smooth'].shift(-half).rolling(
-        window=2*half+1, min_periods=1, center=False
-    ).apply(
-        lambda arr: np.median(arr[half:]) if len(arr) > half else np.nan, raw=True
-    )
-    df2['inc_med_delta'] = (df2['post_inc_med'] - df2['pre_inc_med']).abs()
-    
-    df2['EW_MANEUVER'] = False
-    df2.loc[
-        (df2['EW_candidate']) & (df2['sma_med_delta'] >= sma_abs_thresh_km),
-        'EW_MANEUVER'
-    ] = True
-    
-    df2['NS_MANEUVER'] = False
-    df2.loc[
-        (df2['INC_candidate']) & (df2['inc_med_delta'] >= inc_abs_thresh_deg),
-        'NS_MANEUVER'
-    ] = True
-    
-    df2['MANEUVER'] = df2['EW_MANEUVER'] | df2['NS_MANEUVER']
-    
-    return df2
+    if HAS_NUMBA and len(cols) == 2:
+        # Whole numeric core in compiled loops, one call per element
+        sma_smooth, d_sma, z_sma, sma_cand, pre_sma, post_sma, ew = _detect_core(
+            base[sma_col].to_numpy(dtype=float), z_thresh, sma_abs_thresh_km, half)
+        inc_smooth, d_inc, z_inc, inc_cand, pre_inc, post_inc, ns = _detect_core(
+            base[inc_col].to_numpy(dtype=float), z_thresh, inc_abs_thresh_deg, half)
+        smooth = {sma_col: sma_smooth, inc_col: inc_smooth}
+    else:
+        # Smooth both columns in a single rolling pass
+        smoothed = rolling_median_safe(base[cols], window=3) if cols else None
+        smooth = {c: smoothed[c].to_numpy() for c in cols}
+        
+        d_sma = np.diff(smooth[sma_col], prepend=np.nan) if sma_col in smooth else np.full(n, np.nan)
+        d_inc = np.diff(smooth[inc_col], prepend=np.nan) if inc_col in smooth else np.full(n, np.nan)
+        
+        z_sma = mad_zscore(np.where(np.isnan(d_sma), 0.0, d_sma))
+        z_inc = mad_zscore(np.where(np.isnan(d_inc), 0.0, d_inc))
+        
+        sma_cand = (np.abs(d_sma) >= sma_abs_thresh_km) & (np.abs(z_sma) >= z_thresh)
+        inc_cand = (np.abs(d_inc) >= inc_abs_thresh_deg) & (np.abs(z_inc) >= z_thresh)
+        
+        # Medians of the persist_window+1 smoothed values ending persist_window
+        # rows before (pre) and starting at (post) each row; only needed (and
+        # otherwise left NaN) when that element has candidates to confirm
+        if sma_cand.any():
+            pre_sma, post_sma = _pre_median(smooth[sma_col], half), _post_median(smooth[sma_col], half)
+        else:
+            pre_sma, post_sma = np.full(n, np.nan), np.full(n, np.nan)
+        
+        if inc_cand.any():
+            pre_inc, post_inc = _pre_median(smooth[inc_col], half), _post_median(smooth[inc_col], half)
+        else:
+            pre_inc, post_inc = np.full(n, np.nan), np.full(n, np.nan)
+        
+        # E-W maneuvers are confirmed from SMA candidates only
+        ew = sma_cand & (np.abs(post_sma - pre_sma) >= sma_abs_thresh_km)
+        ns = inc_cand & (np.abs(post_inc - pre_inc) >= inc_abs_thresh_deg)
+    
+    # Collect the outputs as arrays and join them to the input in one concat
+    new_cols = {c + '_smooth': smooth[c] for c in cols}
+    new_cols.update({
+        'dSMA': d_sma,
+        'dINC': d_inc,
+        'z_dSMA': z_sma,
+        'z_dINC': z_inc,
+        'SMA_candidate': sma_cand,
+        'INC_candidate': inc_cand,
+        'pre_sma_med': pre_sma,
+        'post_sma_med': post_sma,
+        'sma_med_delta': np.abs(post_sma - pre_sma),
+        'pre_inc_med': pre_inc,
+        'post_inc_med': post_inc,
+        'inc_med_delta': np.abs(post_inc - pre_inc),
+        'EW_MANEUVER': ew,
+        'NS_MANEUVER': ns,
+        'MANEUVER': ew | ns,
+    })
+    
+    return pd.concat([
+        base.drop(columns=list(new_cols), errors='ignore'),
+        pd.DataFrame(new_cols, index=base.index)
+    ], axis=1)
 
 
 def calculate_maneuver_uniformity(maneuver_dates):
@@ -114,11 +205,10 @@ def calculate_maneuver_uniformity(maneuver_dates):
     if len(maneuver_dates) < 2:
         return None
     
-    maneuver_dates = sorted(maneuver_dates)
-    intervals = [(maneuver_dates[i+1] - maneuver_dates[i]).days 
-                 for i in range(len(maneuver_dates)-1)]
+    maneuver_dates = np.sort(np.asarray(maneuver_dates, dtype='datetime64[ns]'))
+    intervals = np.diff(maneuver_dates).astype('timedelta64[D]').astype(np.float64)
     
-    if not intervals or np.mean(intervals) == 0:
+    if not len(intervals) or np.mean(intervals) == 0:
         return None
     
     return np.std(intervals) / np.mean(intervals)
@@ -3,24 +3,49 @@ Space-Track API module for fetching satellite data
 Handles authentication and data retrieval from space-track.org
 """
 
+from collections import defaultdict
+import numpy as np
+import pandas as pd
 import requests
 import streamlit as st
-from config import LOGIN_URL
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import LOGIN_URL, R_EARTH
+from drift_analysis import calculate_longitudinal_drift
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # orjson is optional; responses are then decoded with the stdlib parser
+    HAS_ORJSON = False
+
+
+def _json(resp):
+    """Decode a JSON response body, with orjson when it is installed."""
+    return orjson.loads(resp.content) if HAS_ORJSON else resp.json()
 
 
 @st.cache_resource
 def get_spacetrack_session(username: str, password: str):
     """Returns a logged-in requests.Session cached as a resource."""
     s = requests.Session()
+    # Keep-alive pool shared by all Space-Track calls; GETs are retried with
+    # backoff on throttling and server errors, the final status is still returned
+    adapter = HTTPAdapter(
+        pool_connections=16, pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                          raise_on_status=False)
+    )
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
     resp = s.post(LOGIN_URL, data={'identity': username, 'password': password})
     if resp.status_code != 200:
         raise Exception(f"Space-Track login failed: HTTP {resp.status_code}")
     return s
 
 
-@st.cache_data(ttl=3600)
 def fetch_tle_json_cached(norad_id: int, start_date: str, end_date: str, username: str, password: str):
-    """Cached fetch of the GP history JSON."""
+    """Fetch of the GP history JSON (cached by the cached_api wrappers)."""
     session = get_spacetrack_session(username, password)
     gp_url = (
         f"https://www.space-track.org/basicspacedata/query/class/gp_history/"
@@ -29,12 +54,29 @@ def fetch_tle_json_cached(norad_id: int, start_date: str, end_date: str, usernam
     resp = session.get(gp_url)
     if resp.status_code != 200:
         raise Exception(f"Failed to fetch GP data for {norad_id}: HTTP {resp.status_code}")
-    return resp.json()
+    return _json(resp)
+
+
+def fetch_gp_histories_batched(norad_ids, start_date: str, end_date: str, username: str, password: str):
+    """Fetch the GP histories of several satellites in one query, grouped by NORAD ID."""
+    session = get_spacetrack_session(username, password)
+    ids_str = ','.join(map(str, norad_ids))
+    gp_url = (
+        f"https://www.space-track.org/basicspacedata/query/class/gp_history/"
+        f"EPOCH/{start_date}--{end_date}/NORAD_CAT_ID/{ids_str}/orderby/NORAD_CAT_ID,EPOCH asc/format/json"
+    )
+    resp = session.get(gp_url)
+    if resp.status_code != 200:
+        raise Exception(f"Failed to fetch GP data for {ids_str}: HTTP {resp.status_code}")
+    
+    histories = defaultdict(list)
+    for record in _json(resp):
+        histories[int(record.get('NORAD_CAT_ID', record.get('norad_cat_id')))].append(record)
+    return {int(norad_id): histories[int(norad_id)] for norad_id in norad_ids}
 
 
-@st.cache_data(ttl=3600)
 def fetch_multiple_tles(norad_ids, username: str, password: str):
-    """Fetch latest TLE data for multiple satellites."""
+    """Fetch latest TLE data for multiple satellites (cached by the cached_api wrappers)."""
     session = get_spacetrack_session(username, password)
     ids_str = ','.join(map(str, norad_ids))
     query_url = (
@@ -50,60 +92,55 @@ def fetch_multiple_tles(norad_ids, username: str, password: str):
 def fetch_and_classify_satellite(norad_id: int, start_date: str, end_date: str,
                                  username: str, password: str, igso_min=10, deviation_tol=0.3):
     """Fetches and classifies satellite data."""
-    import pandas as pd
-    import numpy as np
-    from config import R_EARTH
-    
     data = fetch_tle_json_cached(int(norad_id), start_date, end_date, username, password)
+    return classify_gp_history(data, norad_id, igso_min=igso_min, deviation_tol=deviation_tol)
 
+
+def classify_gp_history(data, norad_id: int, igso_min=10, deviation_tol=0.3):
+    """Classifies one satellite's GP history records (as returned by Space-Track)."""
     if not data:
         raise ValueError(f"No GP data found for NORAD ID {norad_id} in given range")
 
-    df = pd.DataFrame(data)
-
-    # Standardize column names
-    if 'EPOCH' not in df.columns and 'epoch' in df.columns:
-        df.rename(columns={'epoch': 'EPOCH'}, inplace=True)
-    if 'INCLINATION' not in df.columns and 'inclination' in df.columns:
-        df.rename(columns={'inclination': 'INCLINATION'}, inplace=True)
-    if 'SEMIMAJOR_AXIS' not in df.columns and 'semimajor_axis' in df.columns:
-        df.rename(columns={'semimajor_axis': 'SEMIMAJOR_AXIS'}, inplace=True)
-    if 'MEAN_MOTION' not in df.columns and 'mean_motion' in df.columns:
-        df.rename(columns={'mean_motion': 'MEAN_MOTION'}, inplace=True)
+    # Standardize column names: upper-cased name -> record key, exact
+    # upper-case keys winning over other spellings of the same field
+    present = set().union(*data)
+    keys = {key.upper(): key for key in present}
+    keys.update({key: key for key in present if key.isupper()})
+    fields = {name: keys[name] for name in ('EPOCH', 'INCLINATION', 'SEMIMAJOR_AXIS', 'MEAN_MOTION')
+              if name in keys}
 
-    if 'EPOCH' not in df.columns or 'INCLINATION' not in df.columns:
+    if 'EPOCH' not in fields or 'INCLINATION' not in fields:
         raise ValueError("GP JSON missing required fields 'EPOCH' or 'INCLINATION'")
 
-    required_cols = ['EPOCH', 'INCLINATION']
-    if 'SEMIMAJOR_AXIS' in df.columns:
-        required_cols.append('SEMIMAJOR_AXIS')
-    if 'MEAN_MOTION' in df.columns:
-        required_cols.append('MEAN_MOTION')
-    
-    df = df[required_cols].copy()
-    df['EPOCH'] = pd.to_datetime(df['EPOCH'])
-    df['INCLINATION'] = df['INCLINATION'].astype(float)
+    # Build only the needed columns straight from the records, numeric ones as float64
+    df = pd.DataFrame({
+        name: [record.get(key) for record in data] if name == 'EPOCH'
+        else np.array([record.get(key) for record in data], dtype=np.float64)
+        for name, key in fields.items()
+    })
+    # Space-Track epochs are ISO 8601 UTC without an offset; the C ISO parser
+    # handles them directly and they stay naive UTC like the rest of the app
+    df['EPOCH'] = pd.to_datetime(df['EPOCH'], format='ISO8601')
     
     # Calculate longitudinal drift
     if 'MEAN_MOTION' in df.columns:
-        df['MEAN_MOTION'] = df['MEAN_MOTION'].astype(float)
-        from drift_analysis import calculate_longitudinal_drift
         df['LonDrift_deg_per_day'] = calculate_longitudinal_drift(df['MEAN_MOTION'])
 
     # Classify satellite type
-    df['type'] = df['INCLINATION'].apply(
-        lambda x: 'GSO' if (x > 0.0 and x < 10.0) else ('IGSO' if x >= igso_min else 'Unclassified')
+    incl = df['INCLINATION'].to_numpy()
+    df['type'] = np.select(
+        [(incl > 0.0) & (incl < 10.0), incl >= igso_min],
+        ['GSO', 'IGSO'], default='Unclassified'
     )
 
     mean_incl = df['INCLINATION'].mean()
     df['mean_inclination'] = mean_incl
-    df['maintained'] = df['INCLINATION'].apply(lambda x: abs(x - mean_incl) <= deviation_tol)
+    df['maintained'] = np.abs(incl - mean_incl) <= deviation_tol
 
     df = df.sort_values('EPOCH').reset_index(drop=True)
 
     # Calculate altitude
     if 'SEMIMAJOR_AXIS' in df.columns:
-        df['SEMIMAJOR_AXIS'] = df['SEMIMAJOR_AXIS'].astype(float)
         df['altitude_km'] = df['SEMIMAJOR_AXIS'] - R_EARTH
     else:
         df['SEMIMAJOR_AXIS'] = np.nan
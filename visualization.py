@@ -4,28 +4,92 @@ Handles all plotting and visualization functions for the NavIC monitoring system
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 from config import INDIA_EXTREME_POINTS, INACTIVE_SATELLITES
-from dop_calculations import calculate_dop_for_location, calculate_bounding_boxes
+from dop_calculations import calculate_dop_batch, calculate_bounding_boxes
+
+try:
+    from plotly_resampler import FigureResampler
+    from plotly_resampler.aggregation import LTTB, MinMaxLTTB
+    HAS_RESAMPLER = True
+except ImportError:  # plotly-resampler is optional; figures then carry every point
+    HAS_RESAMPLER = False
+
+try:
+    import kaleido  # noqa: F401  (plotly's static image backend)
+    HAS_KALEIDO = True
+except ImportError:  # kaleido is optional; the DOP plot is then always interactive
+    HAS_KALEIDO = False
+
+# Trace colours for the combined ground tracks, cycled per satellite
+_PALETTE = ('#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A', '#19D3F3', '#FF6692')
+
+# Corners of the closed bounding-box outline, as indices into (min, max)
+_BOX_LON_IDX = (0, 1, 1, 0, 0)
+_BOX_LAT_IDX = (0, 0, 1, 1, 0)
+
+# Shared natural-earth styling for the Scattergeo ground-track fallback
+_GEO_BASE = dict(
+    projection_type="natural earth",
+    showland=True,
+    landcolor="lightgray",
+    showocean=True,
+    oceancolor="lightblue",
+    showcountries=True,
+    countrycolor="white",
+    showlakes=True,
+    lakecolor="lightblue",
+)
+
+
+# Figures whose traces are all at most this long are plotted at full resolution
+_RESAMPLE_MIN_POINTS = 2000
+
+# Longest trace above which MinMax preselection is put in front of LTTB
+_MINMAX_MIN_POINTS = 5000
+
+
+def _resampled(fig, n_shown_samples=1000):
+    """
+    Wrap a time-series figure in a FigureResampler when plotly-resampler is
+    installed and some trace is longer than _RESAMPLE_MIN_POINTS.
+    
+    st.plotly_chart has no relayout callback, so the aggregation is fixed
+    at render time and zooming does not add detail; smaller figures (most
+    per-satellite series) are therefore returned unchanged.
+    """
+    if not HAS_RESAMPLER:
+        return fig
+    longest = max((len(trace.x) for trace in fig.data if trace.x is not None), default=0)
+    if longest <= _RESAMPLE_MIN_POINTS:
+        return fig
+    # MinMax preselection (tsdownsample) only pays off on long traces;
+    # below that plain LTTB runs on every point
+    downsampler = MinMaxLTTB() if longest > _MINMAX_MIN_POINTS else LTTB()
+    return FigureResampler(fig, default_n_shown_samples=n_shown_samples,
+                           default_downsampler=downsampler)
 
 
 def plot_individual_satellites(df_all):
     """Plot individual satellite data (inclination, altitude, drift)."""
     st.subheader("Individual Satellite Plots")
     
-    for sat_name in sorted(df_all['satellite'].unique()):
-        sat_df = df_all[df_all['satellite'] == sat_name].copy()
+    # One groupby split instead of a mask per satellite; the plots only read sat_df.
+    # main_app stores 'satellite' as a category, so groups come out in the (sorted)
+    # category order from the codes without a unique()/sorted() pass.
+    for sat_name, sat_df in df_all.groupby('satellite', sort=True, observed=True):
         
         st.markdown(f"### {sat_name}")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_incl = px.line(
+            fig_incl = _resampled(px.line(
                 sat_df,
                 x='EPOCH',
                 y='INCLINATION',
@@ -33,21 +97,21 @@ def plot_individual_satellites(df_all):
                 title=f"{sat_name} - Inclination Over Time",
                 labels={'EPOCH': 'Epoch', 'INCLINATION': 'Inclination (°)'},
                 hover_data=['INCLINATION', 'type']
-            )
+            ))
             fig_incl.update_traces(line_color='#636EFA')
             fig_incl.update_layout(hovermode='x unified', showlegend=False)
             st.plotly_chart(fig_incl, use_container_width=True)
         
         with col2:
             if 'altitude_km' in sat_df.columns and not sat_df['altitude_km'].isna().all():
-                fig_alt = px.line(
+                fig_alt = _resampled(px.line(
                     sat_df,
                     x='EPOCH',
                     y='altitude_km',
                     markers=True,
                     title=f"{sat_name} - Altitude Above Surface",
                     labels={'EPOCH': 'Epoch', 'altitude_km': 'Altitude (km)'}
-                )
+                ))
                 fig_alt.update_traces(line_color='#EF553B')
                 fig_alt.update_layout(hovermode='x unified', showlegend=False)
                 st.plotly_chart(fig_alt, use_container_width=True)
@@ -56,14 +120,14 @@ def plot_individual_satellites(df_all):
         
         # Drift plot
         if 'LonDrift_deg_per_day' in sat_df.columns and not sat_df['LonDrift_deg_per_day'].isna().all():
-            fig_drift = px.line(
+            fig_drift = _resampled(px.line(
                 sat_df,
                 x='EPOCH',
                 y='LonDrift_deg_per_day',
                 markers=True,
                 title=f"{sat_name} - Longitudinal Drift Over Time",
                 labels={'EPOCH': 'Epoch', 'LonDrift_deg_per_day': 'Drift (°/day)'}
-            )
+            ))
             fig_drift.update_traces(line_color='#00CC96')
             fig_drift.update_layout(hovermode='x unified', showlegend=False)
             
@@ -76,45 +140,86 @@ def plot_individual_satellites(df_all):
         st.markdown("---")
 
 
-def plot_combined_drift(df_all):
-    """Plot combined drift comparison for all satellites."""
-    if 'LonDrift_deg_per_day' in df_all.columns:
-        st.subheader("All Satellites - Drift Comparison")
-        fig_all_drift = px.line(
-            df_all[df_all['LonDrift_deg_per_day'].notna()],
-            x='EPOCH',
-            y='LonDrift_deg_per_day',
-            color='satellite',
-            markers=False,
-            title="All NavIC Satellites - Longitudinal Drift Over Time",
-            labels={'EPOCH': 'Epoch', 'LonDrift_deg_per_day': 'Drift (°/day)', 'satellite': 'Satellite'}
-        )
-        fig_all_drift.add_hline(y=0, line_dash="dash", line_color="white", 
-                               annotation_text="Zero Drift", annotation_position="right")
-        fig_all_drift.update_layout(hovermode='x unified', height=500)
-        st.plotly_chart(fig_all_drift, use_container_width=True)
+def _plot_combined_timeseries(df_all, y_col, subheader, title, y_label, plot_df=None, reference_line=None):
+    """
+    Plot y_col over time for all satellites as one resampled WebGL line chart.
+    
+    plot_df defaults to the rows of df_all where y_col is present;
+    reference_line is an optional (y, label) horizontal marker.
+    """
+    if y_col not in df_all.columns:
+        return
+    if plot_df is None:
+        plot_df = df_all[df_all[y_col].notna()]
+    if plot_df.empty:
+        return
+    
+    st.subheader(subheader)
+    fig = _resampled(px.line(
+        plot_df,
+        x='EPOCH',
+        y=y_col,
+        color='satellite',
+        markers=False,
+        render_mode='webgl',
+        title=title,
+        labels={'EPOCH': 'Epoch', y_col: y_label, 'satellite': 'Satellite'}
+    ), n_shown_samples=1500)
+    if reference_line is not None:
+        y, label = reference_line
+        fig.add_hline(y=y, line_dash="dash", line_color="white", 
+                      annotation_text=label, annotation_position="right")
+    fig.update_layout(hovermode='x unified', height=500)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def plot_combined_drift(df_all, drift_df=None):
+    """Plot combined drift comparison for all satellites (drift_df: rows with drift, if already filtered)."""
+    _plot_combined_timeseries(df_all, 'LonDrift_deg_per_day', "All Satellites - Drift Comparison",
+                              "All NavIC Satellites - Longitudinal Drift Over Time", 'Drift (°/day)',
+                              plot_df=drift_df, reference_line=(0, "Zero Drift"))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _bounding_boxes(sat_names, reference_time, timestep_minutes, prop_duration_days, _satellites):
+    """
+    calculate_bounding_boxes, cached so unrelated widget reruns skip the propagation.
+    
+    Keyed on the satellite names, (hour-rounded) reference time, timestep
+    and duration; the satellite objects themselves are not hashed.
+    """
+    return calculate_bounding_boxes(_satellites, reference_time, timestep_minutes=timestep_minutes,
+                                    prop_duration_days=prop_duration_days)
 
 
-def plot_bounding_boxes(satellites, reference_time, timestep_minutes=15, prop_duration_days=1.5):
-    """Plot satellite ground track bounding boxes."""
+def plot_bounding_boxes(satellites, reference_time, timestep_minutes=15, prop_duration_days=1.5,
+                        map_tiles=True):
+    """
+    Plot satellite ground track bounding boxes.
+    
+    map_tiles draws the tracks as WebGL Scattermap traces over map tiles;
+    otherwise (or on plotly releases without Scattermap) they are drawn as
+    Scattergeo traces on an SVG natural-earth projection.
+    """
     st.subheader("🗺️ Satellite Ground Track Bounding Boxes")
     st.caption("Shows the geographic coverage area for each satellite over the next 1.5 days")
+    map_tiles = map_tiles and hasattr(go, 'Scattermap')
     
     with st.spinner("Calculating satellite ground tracks..."):
-        bounding_boxes = calculate_bounding_boxes(
-            satellites, 
-            reference_time, 
-            timestep_minutes=timestep_minutes, 
-            prop_duration_days=prop_duration_days
-        )
+        # Start on the hour: reference_time is refreshed on every rerun, so the
+        # unrounded value would give each rerun a new cache key
+        start_time = reference_time.replace(minute=0, second=0, microsecond=0)
+        bounding_boxes = _bounding_boxes(tuple(satellites), start_time, timestep_minutes,
+                                         prop_duration_days, satellites)
         
         if bounding_boxes:
             for sat_name, box_data in bounding_boxes.items():
                 st.markdown(f"#### {sat_name} Ground Track")
                 
                 fig = go.Figure()
+                trace = go.Scattermap if map_tiles else go.Scattergeo
                 
-                fig.add_trace(go.Scattergeo(
+                fig.add_trace(trace(
                     lon=box_data['longitudes'],
                     lat=box_data['latitudes'],
                     mode='lines+markers',
@@ -123,46 +228,40 @@ def plot_bounding_boxes(satellites, reference_time, timestep_minutes=15, prop_du
                     line=dict(width=2)
                 ))
                 
-                box_lons = [
-                    box_data['min_lon'], box_data['max_lon'], 
-                    box_data['max_lon'], box_data['min_lon'], 
-                    box_data['min_lon']
-                ]
-                box_lats = [
-                    box_data['min_lat'], box_data['min_lat'], 
-                    box_data['max_lat'], box_data['max_lat'], 
-                    box_data['min_lat']
-                ]
+                lon_range = (box_data['min_lon'], box_data['max_lon'])
+                lat_range = (box_data['min_lat'], box_data['max_lat'])
+                box_lons = [lon_range[i] for i in _BOX_LON_IDX]
+                box_lats = [lat_range[i] for i in _BOX_LAT_IDX]
                 
-                fig.add_trace(go.Scattergeo(
+                # Map traces support neither dashed lines nor the 'x' marker symbol
+                fig.add_trace(trace(
                     lon=box_lons,
                     lat=box_lats,
                     mode='lines',
                     name='Bounding Box',
-                    line=dict(color='red', width=2, dash='dash')
+                    line=dict(color='red', width=2) if map_tiles else dict(color='red', width=2, dash='dash')
                 ))
                 
-                fig.add_trace(go.Scattergeo(
+                fig.add_trace(trace(
                     lon=[box_data['mean_lon']],
                     lat=[box_data['mean_lat']],
                     mode='markers',
                     name='Center',
-                    marker=dict(size=10, color='red', symbol='x')
+                    marker=dict(size=10, color='red') if map_tiles else dict(size=10, color='red', symbol='x')
                 ))
                 
-                fig.update_geos(
-                    projection_type="natural earth",
-                    showland=True,
-                    landcolor="lightgray",
-                    showocean=True,
-                    oceancolor="lightblue",
-                    showcountries=True,
-                    countrycolor="white",
-                    showlakes=True,
-                    lakecolor="lightblue",
-                    center=dict(lon=box_data['mean_lon'], lat=box_data['mean_lat']),
-                    projection_scale=3
-                )
+                if map_tiles:
+                    fig.update_layout(map=dict(
+                        style='open-street-map',
+                        center=dict(lon=box_data['mean_lon'], lat=box_data['mean_lat']),
+                        zoom=2
+                    ))
+                else:
+                    fig.update_geos(
+                        **_GEO_BASE,
+                        center=dict(lon=box_data['mean_lon'], lat=box_data['mean_lat']),
+                        projection_scale=3
+                    )
                 
                 fig.update_layout(
                     title=f"{sat_name} - Geographic Coverage (1.5 days)",
@@ -185,23 +284,23 @@ def plot_bounding_boxes(satellites, reference_time, timestep_minutes=15, prop_du
                 
                 st.markdown("---")
             
-            plot_combined_ground_tracks(bounding_boxes)
+            plot_combined_ground_tracks(bounding_boxes, map_tiles=map_tiles)
         else:
             st.warning("No bounding box data available for plotting.")
 
 
-def plot_combined_ground_tracks(bounding_boxes):
-    """Plot combined ground tracks for all satellites."""
+def plot_combined_ground_tracks(bounding_boxes, map_tiles=True):
+    """Plot combined ground tracks for all satellites (map_tiles as in plot_bounding_boxes)."""
     st.markdown("#### All Satellites - Combined Ground Tracks")
+    map_tiles = map_tiles and hasattr(go, 'Scattermap')
     
     fig_combined = go.Figure()
-    
-    colors = ['#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A', '#19D3F3', '#FF6692']
+    trace = go.Scattermap if map_tiles else go.Scattergeo
     
     for idx, (sat_name, box_data) in enumerate(bounding_boxes.items()):
-        color = colors[idx % len(colors)]
+        color = _PALETTE[idx % len(_PALETTE)]
         
-        fig_combined.add_trace(go.Scattergeo(
+        fig_combined.add_trace(trace(
             lon=box_data['longitudes'],
             lat=box_data['latitudes'],
             mode='lines',
@@ -210,19 +309,14 @@ def plot_combined_ground_tracks(bounding_boxes):
             showlegend=True
         ))
     
-    fig_combined.update_geos(
-        projection_type="natural earth",
-        showland=True,
-        landcolor="lightgray",
-        showocean=True,
-        oceancolor="lightblue",
-        showcountries=True,
-        countrycolor="white",
-        showlakes=True,
-        lakecolor="lightblue",
-        center=dict(lon=80, lat=20),
-        projection_scale=2
-    )
+    if map_tiles:
+        fig_combined.update_layout(map=dict(style='open-street-map', center=dict(lon=80, lat=20), zoom=1.5))
+    else:
+        fig_combined.update_geos(
+            **_GEO_BASE,
+            center=dict(lon=80, lat=20),
+            projection_scale=2
+        )
     
     fig_combined.update_layout(
         title="All NavIC Satellites - Combined Ground Tracks",
@@ -238,22 +332,20 @@ def plot_sky_plot(satellites, sat_positions, location_meta, elevation_mask_deg):
     st.subheader("🧭 Azimuth–Elevation Sky Plot")
     
     # Prepare polar coordinates: r = 90 - elevation (so zenith at center), theta = azimuth
-    az_list = []
-    r_list = []
-    names = []
-    for name, pos in zip([s for s in satellites.keys()], sat_positions):
-        if pos is None:
-            continue
-        if pos['elevation'] > elevation_mask_deg:
-            az_list.append(pos['azimuth'])
-            r_list.append(max(0, 90 - pos['elevation']))
-            names.append(name)
+    # (satellites without a position get elevation -90 and always fall below the mask)
+    n = len(sat_positions)
+    elev = np.fromiter((pos['elevation'] if pos else -90.0 for pos in sat_positions), dtype=np.float64, count=n)
+    az = np.fromiter((pos['azimuth'] if pos else 0.0 for pos in sat_positions), dtype=np.float64, count=n)
+    visible = elev > elevation_mask_deg
+    r = np.maximum(0, 90 - elev[visible])
+    theta = az[visible]
+    names = np.array(list(satellites)[:n], dtype=object)[visible]
     
-    if len(az_list) > 0:
+    if visible.any():
         fig_sky = go.Figure()
         fig_sky.add_trace(go.Scatterpolar(
-            r=r_list,
-            theta=az_list,
+            r=r,
+            theta=theta,
             mode='markers+text',
             text=names,
             textposition='top center',
@@ -273,9 +365,34 @@ def plot_sky_plot(satellites, sat_positions, location_meta, elevation_mask_deg):
         st.info("No satellites above the elevation mask for sky plot at this time.")
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def _dop_time_series(sat_names, lat, lon, elevation_mask_deg, start_time, _satellites):
+    """
+    DOP every 6 hours over 30 days from start_time, in one batched call.
+    
+    Cached on the satellite names, location, mask and (hour-rounded) start
+    time; the satellite objects themselves are not hashed.
+    """
+    time_points = np.datetime64(start_time, 's') + np.arange(0, 30*24, 6).astype('timedelta64[h]')
+    dop = calculate_dop_batch(_satellites, [lat], [lon], time_points,
+                              elevation_mask_deg=elevation_mask_deg)
+    return time_points, {key: dop[key][0] for key in ('GDOP', 'PDOP', 'HDOP', 'VDOP', 'visible')}
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _dop_png(sat_names, lat, lon, elevation_mask_deg, start_time, location_name, _fig):
+    """PNG snapshot of the DOP-over-time figure, cached on the same inputs as its data."""
+    return _fig.to_image(format='png', width=1200, height=800)
+
+
 def plot_dop_over_time(satellites, use_custom_location, custom_lat, custom_lon, 
-                      elevation_mask_deg, selected_location=None):
-    """Plot DOP values over time."""
+                      elevation_mask_deg, selected_location=None, interactive=True):
+    """
+    Plot DOP values over time.
+    
+    Unless interactive is set, the figure is served as a static PNG
+    (when kaleido is installed and can render it).
+    """
     st.subheader("📡 DOP Over Time (30 Days)")
     
     if use_custom_location:
@@ -290,33 +407,15 @@ def plot_dop_over_time(satellites, use_custom_location, custom_lat, custom_lon,
             return
     
     with st.spinner(f"Calculating DOP over time for {timeseries_location_name}..."):
-        current_time = datetime.utcnow()
-        time_points = []
-        gdop_values = []
-        pdop_values = []
-        hdop_values = []
-        vdop_values = []
-        visible_sat_counts = []
-        
-        for hours in range(0, 30*24, 6):
-            calc_time = current_time + timedelta(hours=hours)
-            dop, visible_sats, _ = calculate_dop_for_location(
-                satellites, lat, lon, calc_time, elevation_mask_deg=elevation_mask_deg
-            )
-            
-            time_points.append(calc_time)
-            visible_sat_counts.append(len(visible_sats))
-            
-            if dop:
-                gdop_values.append(dop['GDOP'])
-                pdop_values.append(dop['PDOP'])
-                hdop_values.append(dop['HDOP'])
-                vdop_values.append(dop['VDOP'])
-            else:
-                gdop_values.append(None)
-                pdop_values.append(None)
-                hdop_values.append(None)
-                vdop_values.append(None)
+        # Start on the hour so reruns within the hour reuse the cached series
+        current_time = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        time_points, dop = _dop_time_series(tuple(satellites), lat, lon, elevation_mask_deg,
+                                            current_time, satellites)
+        gdop_values = dop['GDOP']
+        pdop_values = dop['PDOP']
+        hdop_values = dop['HDOP']
+        vdop_values = dop['VDOP']
+        visible_sat_counts = dop['visible']
         
         fig = make_subplots(
             rows=2, cols=1,
@@ -326,28 +425,28 @@ def plot_dop_over_time(satellites, use_custom_location, custom_lat, custom_lon,
         )
         
         fig.add_trace(
-            go.Scatter(x=time_points, y=gdop_values, name='GDOP', 
+            go.Scattergl(x=time_points, y=gdop_values, name='GDOP', 
                      line=dict(color='#636EFA')),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(x=time_points, y=pdop_values, name='PDOP', 
+            go.Scattergl(x=time_points, y=pdop_values, name='PDOP', 
                      line=dict(color='#EF553B')),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(x=time_points, y=hdop_values, name='HDOP', 
+            go.Scattergl(x=time_points, y=hdop_values, name='HDOP', 
                      line=dict(color='#00CC96')),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(x=time_points, y=vdop_values, name='VDOP', 
+            go.Scattergl(x=time_points, y=vdop_values, name='VDOP', 
                      line=dict(color='#AB63FA')),
             row=1, col=1
         )
         
         fig.add_trace(
-            go.Scatter(x=time_points, y=visible_sat_counts, name='Visible Satellites',
+            go.Scattergl(x=time_points, y=visible_sat_counts, name='Visible Satellites',
                      line=dict(color='#FFA15A'), fill='tozeroy'),
             row=2, col=1
         )
@@ -359,45 +458,37 @@ def plot_dop_over_time(satellites, use_custom_location, custom_lat, custom_lon,
         
         fig.update_layout(height=800, showlegend=True, hovermode='x unified')
         
+        if not interactive and HAS_KALEIDO:
+            try:
+                st.image(_dop_png(tuple(satellites), lat, lon, elevation_mask_deg, current_time,
+                                  timeseries_location_name, fig), use_container_width=True)
+                return
+            except Exception:  # kaleido could not start a browser; fall back to the live figure
+                pass
+        
         st.plotly_chart(fig, use_container_width=True)
 
 
 def plot_combined_inclination(df_all):
     """Plot combined inclination comparison for all satellites."""
-    st.subheader("📈 All Satellites - Inclination Comparison")
-    fig_all_incl = px.line(
-        df_all,
-        x='EPOCH',
-        y='INCLINATION',
-        color='satellite',
-        markers=False,
-        title="All NavIC Satellites - Inclination Over Time",
-        labels={'EPOCH': 'Epoch', 'INCLINATION': 'Inclination (°)', 'satellite': 'Satellite'}
-    )
-    fig_all_incl.update_layout(hovermode='x unified', height=500)
-    st.plotly_chart(fig_all_incl, use_container_width=True)
-
-
-def plot_combined_altitude(df_all):
-    """Plot combined altitude comparison for all satellites."""
-    if 'altitude_km' in df_all.columns and not df_all['altitude_km'].isna().all():
-        st.subheader("🛰️ All Satellites - Altitude Comparison")
-        fig_all_alt = px.line(
-            df_all[df_all['altitude_km'].notna()],
-            x='EPOCH',
-            y='altitude_km',
-            color='satellite',
-            markers=False,
-            title="All NavIC Satellites - Altitude Over Time",
-            labels={'EPOCH': 'Epoch', 'altitude_km': 'Altitude (km)', 'satellite': 'Satellite'}
-        )
-        fig_all_alt.update_layout(hovermode='x unified', height=500)
-        st.plotly_chart(fig_all_alt, use_container_width=True)
+    _plot_combined_timeseries(df_all, 'INCLINATION', "📈 All Satellites - Inclination Comparison",
+                              "All NavIC Satellites - Inclination Over Time", 'Inclination (°)',
+                              plot_df=df_all)
+
 
+def plot_combined_altitude(df_all, alt_df=None):
+    """Plot combined altitude comparison for all satellites (alt_df: rows with altitude, if already filtered)."""
+    _plot_combined_timeseries(df_all, 'altitude_km', "🛰️ All Satellites - Altitude Comparison",
+                              "All NavIC Satellites - Altitude Over Time", 'Altitude (km)',
+                              plot_df=alt_df)
 
-def plot_drift_distribution(df_all):
-    """Plot drift distribution analysis."""
+
+def plot_drift_distribution(df_all, drift_df=None):
+    """Plot drift distribution analysis (drift_df: rows with drift, if already filtered)."""
     if 'LonDrift_deg_per_day' in df_all.columns:
+        if drift_df is None:
+            drift_df = df_all[df_all['LonDrift_deg_per_day'].notna()]
+        
         st.subheader("📊 Drift Distribution Analysis")
         
         col1, col2 = st.columns(2)
@@ -405,7 +496,7 @@ def plot_drift_distribution(df_all):
         with col1:
             # Histogram of drift values
             fig_hist = px.histogram(
-                df_all[df_all['LonDrift_deg_per_day'].notna()],
+                drift_df,
                 x='LonDrift_deg_per_day',
                 color='satellite',
                 title="Drift Distribution by Satellite",
@@ -418,13 +509,14 @@ def plot_drift_distribution(df_all):
         
         with col2:
             # Box plot of drift by satellite type
-            df_all_with_type = df_all.copy()
-            df_all_with_type['sat_type'] = df_all_with_type['INCLINATION'].apply(
-                lambda x: 'GSO' if (0.0 < x < 10.0) else ('IGSO' if x >= 10.0 else 'Unclassified')
+            incl = drift_df['INCLINATION'].to_numpy()
+            sat_type = np.select(
+                [(incl > 0.0) & (incl < 10.0), incl >= 10.0],
+                ['GSO', 'IGSO'], default='Unclassified'
             )
             
             fig_box = px.box(
-                df_all_with_type[df_all_with_type['LonDrift_deg_per_day'].notna()],
+                drift_df.assign(sat_type=sat_type),
                 x='sat_type',
                 y='LonDrift_deg_per_day',
                 color='sat_type',
@@ -436,13 +528,16 @@ def plot_drift_distribution(df_all):
             st.plotly_chart(fig_box, use_container_width=True)
 
 
-def plot_drift_vs_altitude(df_all):
-    """Plot drift vs altitude correlation."""
+def plot_drift_vs_altitude(df_all, drift_df=None):
+    """Plot drift vs altitude correlation (drift_df: rows with drift, if already filtered)."""
     if 'LonDrift_deg_per_day' in df_all.columns and 'altitude_km' in df_all.columns:
+        if drift_df is None:
+            drift_df = df_all[df_all['LonDrift_deg_per_day'].notna()]
+        
         st.subheader("🔬 Drift vs Altitude Correlation")
         
         fig_scatter = px.scatter(
-            df_all[(df_all['LonDrift_deg_per_day'].notna()) & (df_all['altitude_km'].notna())],
+            drift_df[drift_df['altitude_km'].notna()],
             x='altitude_km',
             y='LonDrift_deg_per_day',
             color='satellite',